@@ -1,11 +1,34 @@
-from models import db, Users, Caregiver, Member, Address, Job, Appointment, JobApplication, CAREGIVING_TYPES, APPOINTMENT_STATUSES
+from models import engine_options, current_replica, db, Users, Caregiver, Member, Address, Job, Appointment, JobApplication, TableStats, CaregiverEarnings, JobApplicationListing, CAREGIVING_TYPES, APPOINTMENT_STATUSES, MAX_WORK_HOURS, COUNTED_TABLES, rebuild_table_stats, rebuild_users_search_table, USERS_SEARCH_TABLE, PHONE_DIGITS_SQL, rebuild_caregiver_earnings, rebuild_job_application_listing, job_application_listing_select, job_application_listing_drift
 import os
 import re
-from flask import Flask, render_template, flash, redirect, url_for, request
-from sqlalchemy.orm import joinedload
-from sqlalchemy.exc import ProgrammingError, IntegrityError
-from sqlalchemy import exists, select, or_, func
-from datetime import date, time, timedelta
+import io
+import csv
+import zlib
+import json
+import base64
+import binascii
+import heapq
+import threading
+import click
+from collections import OrderedDict, Counter, deque
+from collections.abc import Iterable, Iterator
+from contextvars import ContextVar
+from functools import wraps
+from itertools import chain, cycle
+from contextlib import contextmanager
+from bisect import bisect_left, insort
+from typing import NamedTuple
+from time import monotonic, time as unix_time
+from decimal import Decimal
+from flask import Flask, Response, render_template, flash, redirect, url_for, request, session, jsonify, abort, stream_with_context
+from sqlalchemy.orm import aliased, joinedload, selectinload, Session
+from sqlalchemy.orm.attributes import get_history
+from sqlalchemy.exc import ProgrammingError, IntegrityError, SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from sqlalchemy import create_engine, exists, false, select, or_, func, tuple_, type_coerce, text, case, literal, literal_column, null, cast, union_all, bindparam, Date, Float, Integer, event, update, insert, delete, inspect
+from sqlalchemy.dialects.mysql import match
+from datetime import date, datetime, time, timedelta
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,6 +38,11 @@ app = Flask(__name__)
 # Validation patterns
 EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
 PHONE_PATTERN = re.compile(r'^[\d\s\-\+\(\)]{7,20}$')
+PHONE_FORMATTING = re.compile(r'[\s\-\+\(\)]')
+PASSWORD_UPPERCASE = re.compile(r'[A-Z]')
+PASSWORD_LOWERCASE = re.compile(r'[a-z]')
+PASSWORD_DIGIT = re.compile(r'\d')
+PASSWORD_SPECIAL = re.compile(r'[!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]')
 
 
 def validate_email(email: str) -> tuple[bool, str | None]:
@@ -31,7 +59,7 @@ def validate_phone_number(phone: str) -> tuple[bool, str | None]:
     if not phone:
         return False, "Phone number is required."
     # Remove common formatting characters for validation
-    digits_only = re.sub(r'[\s\-\+\(\)]', '', phone)
+    digits_only = PHONE_FORMATTING.sub('', phone)
     if len(digits_only) < 7 or len(digits_only) > 15:
         return False, "Phone number must contain 7-15 digits."
     if not PHONE_PATTERN.match(phone):
@@ -45,13 +73,13 @@ def validate_password(password: str) -> tuple[bool, str | None]:
         return False, "Password is required."
     if len(password) < 8:
         return False, "Password must be at least 8 characters long."
-    if not re.search(r'[A-Z]', password):
+    if not PASSWORD_UPPERCASE.search(password):
         return False, "Password must contain at least one uppercase letter."
-    if not re.search(r'[a-z]', password):
+    if not PASSWORD_LOWERCASE.search(password):
         return False, "Password must contain at least one lowercase letter."
-    if not re.search(r'\d', password):
+    if not PASSWORD_DIGIT.search(password):
         return False, "Password must contain at least one digit."
-    if not re.search(r'[!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]', password):
+    if not PASSWORD_SPECIAL.search(password):
         return False, "Password must contain at least one special character (!@#$%^&*()_+-=[]{}|;':\",./<>?)."
     return True, None
 
@@ -95,34 +123,87 @@ def validate_appointment_date(appointment_date: date) -> tuple[bool, str | None]
     return True, None
 
 
-def check_email_uniqueness(email: str, exclude_user_id: int | None = None) -> tuple[bool, str | None]:
-    """Check if email is unique - returns (is_unique, error_message)"""
-    query = Users.query.filter(Users.email == email)
-    if exclude_user_id:
-        query = query.filter(Users.user_id != exclude_user_id)
-    existing: Users | None = query.first()
-    if existing:
-        return False, "Email already exists. Please use a different email."
+def appointment_span_available() -> bool:
+    """Check once per process whether appointment has the generated starts_at/ends_at columns"""
+    key = 'appointment.starts_at'
+    if key not in _available_tables:
+        columns = inspect(db.engine).get_columns(Appointment.__tablename__)
+        _available_tables[key] = any(column['name'] == 'starts_at' for column in columns)
+    return _available_tables[key]
+
+
+def check_appointment_overlap(caregiver_id: int, appointment_date: date, appointment_time: time,
+                              work_hours: float, exclude_appointment_id: int | None = None) -> tuple[bool, str | None]:
+    """
+    Check that the caregiver has no pending or accepted appointment in the slot - returns (is_free, error_message).
+    The caregiver row stays locked until the caller commits or rolls back, so the
+    check and the write it guards are not interleaved with another booking.
+    """
+    starts_at = datetime.combine(appointment_date, appointment_time)
+    ends_at = starts_at + timedelta(hours=float(work_hours))
+    conditions = [Appointment.caregiver_user_id == caregiver_id,
+                  Appointment.status.in_(('pending', 'accepted'))]
+    if exclude_appointment_id is not None:
+        conditions.append(Appointment.appointment_id != exclude_appointment_id)
+
+    conflict = None
+    with db.session.no_autoflush:
+        # SELECT ... FOR UPDATE on MySQL; SQLite has no row locks but fails the
+        # second of two concurrent writers instead of letting both commit
+        db.session.execute(select(Caregiver.caregiver_user_id).where(
+            Caregiver.caregiver_user_id == caregiver_id).with_for_update())
+        if appointment_span_available():
+            # An overlapping appointment starts less than MAX_WORK_HOURS before this one,
+            # which bounds the range probe on idx_appointment_caregiver_span
+            conflict = db.session.execute(select(
+                Appointment.appointment_id, Appointment.starts_at, Appointment.ends_at
+            ).where(
+                *conditions,
+                Appointment.starts_at > starts_at - timedelta(hours=MAX_WORK_HOURS),
+                Appointment.starts_at < ends_at,
+                Appointment.ends_at > starts_at
+            ).limit(1)).first()
+        else:
+            # Without the generated columns, compare the caregiver's appointments on nearby days
+            for appointment_id, other_date, other_time, other_hours in db.session.execute(select(
+                Appointment.appointment_id, Appointment.appointment_date,
+                Appointment.appointment_time, Appointment.work_hours
+            ).where(
+                *conditions,
+                Appointment.appointment_date.between(appointment_date - timedelta(days=1), ends_at.date())
+            )):
+                other_start = datetime.combine(other_date, other_time)
+                other_end = other_start + timedelta(hours=float(other_hours))
+                if other_start < ends_at and other_end > starts_at:
+                    conflict = (appointment_id, other_start, other_end)
+                    break
+
+    if conflict:
+        appointment_id, other_start, other_end = conflict
+        return False, (f"The caregiver already has appointment #{appointment_id} from "
+                       f"{other_start:%d/%m/%Y %H:%M} to {other_end:%d/%m/%Y %H:%M}, which overlaps this time.")
     return True, None
 
 
-def check_phone_uniqueness(phone: str, exclude_user_id: int | None = None) -> tuple[bool, str | None]:
-    """Check if phone number is unique - returns (is_unique, error_message)"""
-    query = Users.query.filter(Users.phone_number == phone)
-    if exclude_user_id:
-        query = query.filter(Users.user_id != exclude_user_id)
-    existing = query.first()
-    if existing:
-        return False, "Phone number already exists. Please use a different phone number."
-    return True, None
+USER_UNIQUE_FIELDS = {
+    'email': "Email already exists. Please use a different email.",
+    'phone_number': "Phone number already exists. Please use a different phone number.",
+}
 
 
-def reset_user_sequence() -> bool:
-    """Reset auto-increment for MySQL - MySQL handles AUTO_INCREMENT automatically"""
-    # MySQL handles AUTO_INCREMENT automatically, so this function is kept
-    # for compatibility but does nothing. AUTO_INCREMENT will automatically
-    # use the next available ID based on the maximum existing ID.
-    return True
+def unique_violation_message(error: IntegrityError) -> str | None:
+    """Map a violated users UNIQUE constraint to its field error - None for other violations"""
+    # Only the driver message: str(error) also carries the INSERT, which names every column.
+    # MySQL reports "for key 'users.email'", SQLite "failed: users.email", PostgreSQL "users_email_key".
+    message = str(error.orig).lower()
+    key_match = re.search(r"(?:for key '|constraint failed: |unique constraint \")([\w.]+)", message)
+    if not key_match:
+        return None
+    key = key_match.group(1)
+    for field, field_error in USER_UNIQUE_FIELDS.items():
+        if field in key:
+            return field_error
+    return None
 
 
 def get_form_field(field: str, default: str = '') -> str:
@@ -173,6 +254,344 @@ def apply_numeric_range_filter(query, field, min_value: str | None, max_value: s
     return query
 
 
+# Keyset pagination settings
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+PAGINATION_ARGS = ('after', 'before', 'per_page')
+
+
+def get_page_size(default: int = DEFAULT_PAGE_SIZE) -> int:
+    """Read the per_page query parameter, clamped to 1..MAX_PAGE_SIZE"""
+    try:
+        per_page = int(request.args.get('per_page', default))
+    except ValueError:
+        return default
+    return max(1, min(per_page, MAX_PAGE_SIZE))
+
+
+def encode_cursor(values) -> str:
+    """Encode sort key values into an opaque URL-safe cursor"""
+    payload = [v.isoformat() if isinstance(v, (date, time))
+               else str(v) if isinstance(v, Decimal) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, columns) -> list | None:
+    """Decode a cursor into typed sort key values - returns None if the cursor is invalid"""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(
+            cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(raw, list) or len(raw) != len(columns):
+            return None
+        values = []
+        for column, value in zip(columns, raw):
+            python_type = column.type.python_type
+            if python_type in (date, time):
+                values.append(python_type.fromisoformat(value))
+            else:
+                values.append(python_type(value))
+        return values
+    except (ValueError, TypeError, binascii.Error, NotImplementedError):
+        return None
+
+
+def page_url(**cursor: str) -> str:
+    """Build a URL for the current list view with its filters and the given cursor"""
+    args = request.args.to_dict()
+    args.pop('after', None)
+    args.pop('before', None)
+    args.update(cursor)
+    return url_for(request.endpoint, **(request.view_args or {}), **args)
+
+
+def has_active_filters() -> bool:
+    """Check whether the request carries any filter besides pagination arguments"""
+    return any(value for key, value in request.args.items() if key not in PAGINATION_ARGS)
+
+
+def filter_args() -> dict[str, str]:
+    """Return the non-empty filter arguments of the request without pagination arguments"""
+    return {key: value for key, value in request.args.items() if value and key not in PAGINATION_ARGS}
+
+
+def approximate_row_count(table_name: str) -> int | None:
+    """
+    Read an approximate row count from the table statistics instead of COUNT(*).
+    Returns None when the backend keeps no statistics for the table.
+    Runs on its own connection, so a failure cannot roll back the request
+    session and expire the page it has already loaded.
+    """
+    dialect = db.engine.dialect.name
+    try:
+        with db.engine.connect() as connection:
+            if dialect == 'mysql':
+                # InnoDB keeps an estimate in information_schema, refreshed by ANALYZE TABLE
+                return connection.execute(text(
+                    "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name"
+                ), {'table_name': table_name}).scalar()
+            if dialect == 'sqlite':
+                # sqlite_stat1 only exists after ANALYZE; the first number is the row count
+                stat = connection.execute(text(
+                    "SELECT stat FROM sqlite_stat1 WHERE tbl = :table_name LIMIT 1"
+                ), {'table_name': table_name}).scalar()
+                return int(stat.split()[0]) if stat else None
+    except SQLAlchemyError:
+        pass
+    return None
+
+
+def keyset_paginate(query, columns, descending: bool = False, per_page: int | None = None,
+                    approximate_total: bool = True, select_key: bool = False) -> dict:
+    """
+    Fetch one page of a query using keyset (cursor) pagination.
+    The columns must form a unique sort key; the position comes from the
+    'after' / 'before' cursors in the request, so no OFFSET is ever used and
+    every page costs one index range scan regardless of table size.
+    With select_key the key is selected with each item and replaces the
+    query's own ordering, for keys such as a search rank that are not
+    attributes of the items.
+    When approximate_total is set and no filters are active, the page also
+    carries the table's estimated row count from the database statistics.
+    """
+    per_page = per_page or get_page_size()
+    after = request.args.get('after', '')
+    before = request.args.get('before', '')
+    backwards = bool(before) and not after
+
+    cursor = None
+    if after or before:
+        cursor = decode_cursor(before if backwards else after, columns)
+
+    if select_key:
+        query = query.add_columns(*columns).order_by(None)
+
+    # Walking backwards means reading the opposite direction and reversing
+    read_descending = descending != backwards
+    if cursor is not None:
+        sort_key = tuple_(*columns)
+        query = query.filter(sort_key < tuple(cursor) if read_descending
+                             else sort_key > tuple(cursor))
+    query = query.order_by(*[column.desc() if read_descending else column.asc()
+                             for column in columns])
+
+    # Fetch one extra row to know whether another page exists
+    items = query.limit(per_page + 1).all()
+    has_more = len(items) > per_page
+    items = items[:per_page]
+    if backwards:
+        items.reverse()
+
+    def cursor_of(item) -> str:
+        if select_key:
+            return encode_cursor(item[1:])
+        return encode_cursor([getattr(item, column.key) for column in columns])
+
+    has_next = has_more if not backwards else cursor is not None
+    has_prev = cursor is not None if not backwards else has_more
+
+    approx_total = None
+    if approximate_total and not has_active_filters():
+        # The last key column is the unique tiebreaker of the paged table
+        approx_total = approximate_row_count(columns[-1].class_.__tablename__)
+
+    return {
+        'items': [row[0] for row in items] if select_key else items,
+        'per_page': per_page,
+        'approx_total': approx_total,
+        'next_url': page_url(after=cursor_of(items[-1])) if items and has_next else None,
+        'prev_url': page_url(before=cursor_of(items[0])) if items and has_prev else None,
+    }
+
+
+class FacetCache:
+    """
+    In-process cache for filter dropdown values (facets).
+    Entries expire after a TTL, the least recently used entry is evicted once
+    max_entries is reached, and an entry is dropped as soon as a committed
+    transaction writes to any table it was built from.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._dependents: dict[str, set[str]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def register(self, key: str, tables: list[str]):
+        """Record which tables a cache key is built from"""
+        for table in tables:
+            self._dependents.setdefault(table, set()).add(key)
+
+    def get_or_load(self, key: str, loader):
+        """Return the cached value for key, calling loader on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+
+        # Shared across requests, so never filled from a lagging replica
+        with primary_reads():
+            value = loader()
+
+        with self._lock:
+            # Skip the store if a commit invalidated entries while loading
+            if generation == self._generation:
+                self._entries[key] = (monotonic() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def invalidate_tables(self, tables):
+        """Drop every entry built from any of the given tables"""
+        with self._lock:
+            self._generation += 1
+            for table in tables:
+                for key in self._dependents.get(table, ()):
+                    if self._entries.pop(key, None) is not None:
+                        self.invalidations += 1
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+facet_cache = FacetCache(
+    ttl=float(os.getenv('FACET_CACHE_TTL', '300')),
+    max_entries=int(os.getenv('FACET_CACHE_SIZE', '128')))
+
+
+def facet(*models):
+    """Cache a zero-argument facet loader, invalidated when any of the models change"""
+    def decorator(loader):
+        key = loader.__name__
+        facet_cache.register(key, [model.__tablename__ for model in models])
+
+        @wraps(loader)
+        def wrapper():
+            return facet_cache.get_or_load(key, loader)
+        return wrapper
+    return decorator
+
+
+class PoolMetrics:
+    """Checkout counters and a wait-time histogram for the connection pool"""
+
+    # Upper bounds of the checkout wait histogram, in seconds
+    BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self.bucket_counts = [0] * len(self.BUCKETS)
+
+    def observe_checkout(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_sum += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    self.bucket_counts[i] += 1
+                    break
+
+    def count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        """Copy the counters, with cumulative histogram buckets"""
+        with self._lock:
+            cumulative, buckets = 0, []
+            for bound, count in zip(self.BUCKETS, self.bucket_counts):
+                cumulative += count
+                buckets.append((bound, cumulative))
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'connects': self.connects,
+                'invalidations': self.invalidations,
+                'wait_sum': self.wait_sum,
+                'wait_max': self.wait_max,
+                'buckets': buckets,
+            }
+
+
+# Checkout metrics of each database bind: 'primary' and 'replica1', 'replica2', ...
+pool_metrics: dict[str, PoolMetrics] = {}
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits for a connection"""
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = monotonic()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.observe_checkout(monotonic() - started, timed_out=True)
+            raise
+        self.metrics.observe_checkout(monotonic() - started)
+        return connection
+
+
+def timed_pool(bind: str) -> type[TimedQueuePool]:
+    """A TimedQueuePool class reporting into pool_metrics[bind]"""
+    # A class rather than an instance attribute, so that pools recreated by dispose() keep it
+    metrics = pool_metrics[bind] = PoolMetrics()
+    pool_class = type(f'TimedQueuePool_{bind}', (TimedQueuePool,), {'metrics': metrics})
+
+    @event.listens_for(pool_class, 'connect')
+    def count_pool_connect(dbapi_connection, connection_record):
+        metrics.count('connects')
+
+    @event.listens_for(pool_class, 'invalidate')
+    def count_pool_invalidate(dbapi_connection, connection_record, exception):
+        # Stale connections caught by pre-ping or a failed query
+        metrics.count('invalidations')
+
+    return pool_class
+
+
 # Database configuration
 database_url = os.getenv('DATABASE_URL')
 # Convert postgresql:// to mysql+pymysql:// if needed (for backward compatibility)
@@ -183,12 +602,486 @@ elif database_url and database_url.startswith('postgresql+psycopg://'):
         'postgresql+psycopg://', 'mysql+pymysql://', 1)
 app.config['SQLALCHEMY_DATABASE_URI'] = database_url
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(database_url, poolclass=timed_pool('primary'))
 app.secret_key = os.getenv(
     'FLASK_SECRET_KEY', '2-python-projects-in-a-row-i-am-sick-of-this-shit')
 
 # Initialize SQLAlchemy with app
 db.init_app(app)
 
+# Read replicas of DATABASE_URL, comma separated. GET views marked with
+# @replica_reads read from them in turn; everything else uses the primary.
+replica_engines: dict[str, Engine] = {
+    f'replica{i}': create_engine(url, **engine_options(url, poolclass=timed_pool(f'replica{i}')))
+    for i, url in enumerate(filter(None, map(str.strip, os.getenv('DATABASE_REPLICA_URLS', '').split(','))), 1)
+}
+_next_replica = cycle(replica_engines.values())
+_next_replica_lock = threading.Lock()
+# Seconds a browser session reads from the primary after its own write, to see it despite replication lag
+REPLICA_STICKY_SECONDS = float(os.getenv('REPLICA_STICKY_SECONDS', '5'))
+
+
+def replica_reads(view):
+    """Serve a read-only GET view from a replica unless this browser session wrote recently"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not replica_engines or request.method != 'GET' or session.get('primary_until', 0) > unix_time():
+            return view(*args, **kwargs)
+        with _next_replica_lock:
+            replica = next(_next_replica)
+        token = current_replica.set(replica)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            current_replica.reset(token)
+    return wrapper
+
+
+@contextmanager
+def primary_reads():
+    """Read from the primary inside a replica-routed view, e.g. to fill a shared cache"""
+    token = current_replica.set(None)
+    try:
+        yield
+    finally:
+        current_replica.reset(token)
+
+
+@app.after_request
+def stick_to_primary(response):
+    # Every POST route writes; keep this browser's next reads on the primary
+    if replica_engines and request.method == 'POST':
+        session['primary_until'] = unix_time() + REPLICA_STICKY_SECONDS
+    return response
+
+
+# Write-through invalidation: remember which tables each flush touched and
+# drop the dependent cache entries once the transaction commits
+@event.listens_for(Session, 'after_flush')
+def track_changed_tables(session, flush_context):
+    changed = session.info.setdefault('changed_tables', set())
+    for instance in chain(session.new, session.dirty, session.deleted):
+        changed.add(instance.__table__.name)
+
+
+# Derived tables (counters, rollups, read tables) are optional: deployments that
+# have not created one yet skip its maintenance and read the source tables.
+_available_tables: dict[str, bool] = {}
+
+
+def table_available(model, connection=None) -> bool:
+    """Check once per process whether a model's table exists"""
+    name = model.__tablename__
+    if name not in _available_tables:
+        _available_tables[name] = inspect(
+            connection if connection is not None else db.engine).has_table(name)
+    return _available_tables[name]
+
+
+# Materialized row counts: the dashboard reads table_stats instead of running
+# COUNT(*) on every table, so inserts and deletes adjust the counters in the
+# same transaction. Deployments without the table fall back to live counts.
+def table_stats_available(connection=None) -> bool:
+    """Check once per process whether the table_stats table exists"""
+    return table_available(TableStats, connection)
+
+
+def adjust_table_stats(connection, deltas: dict[str, int]):
+    """Add row count deltas to table_stats, one UPDATE per changed table"""
+    for table, delta in deltas.items():
+        if delta and table in COUNTED_TABLES:
+            connection.execute(update(TableStats.__table__).where(
+                TableStats.table_name == table).values(row_count=TableStats.row_count + delta))
+
+
+@event.listens_for(Session, 'after_flush')
+def maintain_table_stats(session, flush_context):
+    if not (session.new or session.deleted):
+        return
+    connection = session.connection()
+    if not table_stats_available(connection):
+        return
+    deltas = Counter()
+    for instance in session.new:
+        deltas[instance.__table__.name] += 1
+    for instance in session.deleted:
+        deltas[instance.__table__.name] -= 1
+    adjust_table_stats(connection, deltas)
+
+
+# Caregiver earnings rollup: the earnings reports read accepted hours and pay per
+# caregiver from caregiver_earnings, so appointment and hourly rate changes apply
+# their deltas in the same transaction instead of re-aggregating every appointment.
+def accepted_hours(appointment: Appointment, previous: bool) -> tuple[int | None, Decimal]:
+    """Caregiver and hours an appointment adds to the rollup before (previous) or after the flush"""
+    values = []
+    for key in ('caregiver_user_id', 'status', 'work_hours'):
+        history = get_history(appointment, key)
+        changed = history.deleted if previous else history.added
+        values.append((changed or history.unchanged or [None])[0])
+    caregiver_id, status, hours = values
+    if status != 'accepted' or caregiver_id is None or hours is None:
+        return None, Decimal(0)
+    return caregiver_id, Decimal(str(hours))
+
+
+def open_caregiver_earnings(connection, caregiver_ids: list[int]):
+    """Insert the empty rollup rows of new caregivers"""
+    connection.execute(insert(CaregiverEarnings.__table__), [
+        {'caregiver_user_id': caregiver_id, 'accepted_hours': 0, 'total_earnings': 0, 'accepted_appointments': 0}
+        for caregiver_id in caregiver_ids])
+
+
+def add_caregiver_earnings(connection, hours: Counter, counts: Counter) -> set[int]:
+    """
+    Add accepted hours and appointments per caregiver to the rollup, valued at
+    the caregiver's current rate - returns the caregivers that have no rollup row
+    """
+    earnings = CaregiverEarnings.__table__
+    # Earnings are valued at the caregiver's current rate, read in the same statement
+    rate = select(Caregiver.hourly_rate).where(
+        Caregiver.caregiver_user_id == earnings.c.caregiver_user_id).scalar_subquery()
+    missing = set()
+    for caregiver_id in hours.keys() | counts.keys():
+        if not hours[caregiver_id] and not counts[caregiver_id]:
+            continue
+        result = connection.execute(update(earnings).where(
+            earnings.c.caregiver_user_id == caregiver_id).values(
+            accepted_hours=earnings.c.accepted_hours + hours[caregiver_id],
+            accepted_appointments=earnings.c.accepted_appointments + counts[caregiver_id],
+            total_earnings=earnings.c.total_earnings + rate * hours[caregiver_id]))
+        if result.rowcount == 0:
+            missing.add(caregiver_id)
+    return missing
+
+
+@event.listens_for(Session, 'after_flush')
+def maintain_caregiver_earnings(session, flush_context):
+    changed = [instance for instance in chain(session.new, session.dirty, session.deleted)
+               if isinstance(instance, (Appointment, Caregiver))]
+    if not changed:
+        return
+    connection = session.connection()
+    if not table_available(CaregiverEarnings, connection):
+        return
+    earnings = CaregiverEarnings.__table__
+
+    created = [instance.caregiver_user_id for instance in session.new if isinstance(instance, Caregiver)]
+    if created:
+        open_caregiver_earnings(connection, created)
+    removed = {instance.caregiver_user_id for instance in session.deleted if isinstance(instance, Caregiver)}
+
+    hours = Counter()
+    counts = Counter()
+    for instance in changed:
+        if not isinstance(instance, Appointment):
+            continue
+        if instance not in session.new:
+            caregiver_id, delta = accepted_hours(instance, previous=True)
+            if caregiver_id is not None:
+                hours[caregiver_id] -= delta
+                counts[caregiver_id] -= 1
+        if instance not in session.deleted:
+            caregiver_id, delta = accepted_hours(instance, previous=False)
+            if caregiver_id is not None:
+                hours[caregiver_id] += delta
+                counts[caregiver_id] += 1
+
+    for caregiver_id in removed:
+        hours.pop(caregiver_id, None)
+        counts.pop(caregiver_id, None)
+    missing = add_caregiver_earnings(connection, hours, counts)
+
+    # A new hourly rate revalues all of the caregiver's accepted hours
+    for instance in changed:
+        if (isinstance(instance, Caregiver) and instance not in session.new and instance not in session.deleted
+                and get_history(instance, 'hourly_rate').deleted):
+            connection.execute(update(earnings).where(
+                earnings.c.caregiver_user_id == instance.caregiver_user_id).values(
+                total_earnings=earnings.c.accepted_hours * instance.hourly_rate))
+
+    # Caregivers inserted with raw SQL have no row yet; compute theirs from scratch
+    if missing:
+        rebuild_caregiver_earnings(connection, missing)
+    if removed:
+        connection.execute(delete(earnings).where(earnings.c.caregiver_user_id.in_(removed)))
+
+
+# Job application listing: the job applications list and job_applications_view
+# read one denormalized row per application, so changes to any of the joined
+# tables rewrite the affected rows in the same transaction.
+LISTING_SOURCE_COLUMNS = {
+    Job: ('required_caregiving_type', 'other_requirements', 'date_posted', 'member_user_id'),
+    Caregiver: ('caregiving_type', 'hourly_rate'),
+    Users: ('given_name', 'surname'),
+}
+
+
+@event.listens_for(Session, 'after_flush')
+def maintain_job_application_listing(session, flush_context):
+    caregiver_ids, job_ids, member_ids = set(), set(), set()
+    for instance in chain(session.new, session.dirty, session.deleted):
+        if isinstance(instance, JobApplication):
+            job_ids.add(instance.job_id)
+            continue
+        columns = LISTING_SOURCE_COLUMNS.get(type(instance))
+        # New jobs, caregivers and users have no applications yet
+        if columns is None or instance in session.new:
+            continue
+        if instance not in session.deleted and not any(
+                get_history(instance, key).has_changes() for key in columns):
+            continue
+        if isinstance(instance, Job):
+            job_ids.add(instance.job_id)
+        elif isinstance(instance, Caregiver):
+            caregiver_ids.add(instance.caregiver_user_id)
+        else:
+            caregiver_ids.add(instance.user_id)
+            member_ids.add(instance.user_id)
+
+    if not (caregiver_ids or job_ids or member_ids):
+        return
+    connection = session.connection()
+    if not table_available(JobApplicationListing, connection):
+        return
+    rebuild_job_application_listing(connection, caregiver_ids or None, job_ids or None, member_ids or None)
+
+
+def job_application_listing():
+    """The job_application_listing table, or the same join as a subquery until it is created"""
+    if table_available(JobApplicationListing):
+        return JobApplicationListing
+    return aliased(JobApplicationListing, job_application_listing_select().subquery(),
+                   name=JobApplicationListing.__tablename__, adapt_on_names=True)
+
+
+# Cascading deletes: relationships use passive deletes, so removing a user,
+# caregiver, member or job leaves its dependent rows to ON DELETE CASCADE
+# instead of loading and deleting them one by one. The flush never sees those
+# rows, so just before it runs they are counted, and the caregivers whose
+# earnings or workload they affect are collected, for the derived tables above.
+CASCADE_PARENTS = (Users, Caregiver, Member, Job)
+
+
+class CascadeEffects(NamedTuple):
+    """Rows the database cascade removes, and the caregivers it affects"""
+    counts: Counter
+    # Caregivers losing accepted appointments, whose earnings must be recounted
+    earnings_caregivers: set[int]
+    # Caregivers losing appointments, whose match index workload changes
+    workload_caregivers: set[int]
+
+    @property
+    def history(self) -> int:
+        """Appointments, job applications and jobs removed"""
+        return sum(self.counts[model.__tablename__] for model in (Appointment, JobApplication, Job))
+
+
+def cascade_effects(connection, deleted: dict[type, set]) -> CascadeEffects:
+    """
+    Measure what ON DELETE CASCADE removes when the rows in deleted (primary
+    keys by model) are deleted: one SELECT of scalar COUNT(*) subqueries, plus
+    one for the other caregivers of deleted members' appointments. Rows that
+    deleted lists themselves are the flush's own and are not counted.
+    """
+    user_ids = deleted.get(Users, set())
+    caregiver_ids = user_ids | deleted.get(Caregiver, set())
+    member_ids = user_ids | deleted.get(Member, set())
+    job_ids = deleted.get(Job, set())
+
+    member_jobs = select(Job.job_id).where(Job.member_user_id.in_(member_ids))
+    reached = {
+        Caregiver: [Caregiver.caregiver_user_id.in_(user_ids)] if user_ids else [],
+        Member: [Member.member_user_id.in_(user_ids)] if user_ids else [],
+        Address: [Address.member_user_id.in_(member_ids)] if member_ids else [],
+        Job: [Job.member_user_id.in_(member_ids)] if member_ids else [],
+        JobApplication: ([JobApplication.caregiver_user_id.in_(caregiver_ids)] if caregiver_ids else [])
+        + ([JobApplication.job_id.in_(job_ids)] if job_ids else [])
+        + ([JobApplication.job_id.in_(member_jobs)] if member_ids else []),
+        Appointment: ([Appointment.caregiver_user_id.in_(caregiver_ids)] if caregiver_ids else [])
+        + ([Appointment.member_user_id.in_(member_ids)] if member_ids else []),
+    }
+    counts = {}
+    for model, conditions in reached.items():
+        if not conditions:
+            continue
+        query = select(func.count()).select_from(model).where(or_(*conditions))
+        own = deleted.get(model)
+        if own:
+            primary_key = inspect(model).primary_key
+            key = tuple_(*primary_key) if len(primary_key) > 1 else primary_key[0]
+            query = query.where(key.not_in(own))
+        counts[model.__tablename__] = query.scalar_subquery()
+
+    effects = CascadeEffects(Counter(), set(), set())
+    if counts:
+        row = connection.execute(select(*(count.label(table) for table, count in counts.items()))).one()
+        effects.counts.update(row._asdict())
+    if member_ids and effects.counts[Appointment.__tablename__]:
+        for caregiver_id, status in connection.execute(
+                select(Appointment.caregiver_user_id, Appointment.status).distinct().where(
+                    Appointment.member_user_id.in_(member_ids),
+                    Appointment.caregiver_user_id.not_in(caregiver_ids))):
+            effects.workload_caregivers.add(caregiver_id)
+            if status == 'accepted':
+                effects.earnings_caregivers.add(caregiver_id)
+    return effects
+
+
+def deleted_keys(session) -> dict[type, set]:
+    """Primary keys of the instances the session is about to delete, by model"""
+    deleted = {}
+    for instance in session.deleted:
+        identity = inspect(instance).identity
+        deleted.setdefault(type(instance), set()).add(identity[0] if len(identity) == 1 else identity)
+    return deleted
+
+
+@event.listens_for(Session, 'before_flush')
+def measure_cascades(session, flush_context, instances):
+    if not any(isinstance(instance, CASCADE_PARENTS) for instance in session.deleted):
+        return
+    deleted = deleted_keys(session)
+    # Routes that already measured this delete (to choose a background purge) pass it on
+    measured = session.info.pop('measured_cascade', None)
+    if measured is not None and measured[0] == deleted:
+        effects = measured[1]
+    else:
+        effects = cascade_effects(session.connection(), deleted)
+    session.info['cascade_effects'] = effects
+
+
+@event.listens_for(Session, 'after_flush')
+def apply_cascades(session, flush_context):
+    effects = session.info.pop('cascade_effects', None)
+    if effects is not None:
+        apply_cascade_effects(session, effects)
+
+
+def apply_cascade_effects(session, effects: CascadeEffects):
+    """Update table_stats, caregiver_earnings and the match index for rows the database removed"""
+    removed = {table: count for table, count in effects.counts.items() if count}
+    session.info.setdefault('changed_tables', set()).update(removed)
+    session.info.setdefault('stale_caregivers', set()).update(effects.workload_caregivers)
+    connection = session.connection()
+    if removed and table_stats_available(connection):
+        adjust_table_stats(connection, {table: -count for table, count in removed.items()})
+    if effects.earnings_caregivers and table_available(CaregiverEarnings, connection):
+        rebuild_caregiver_earnings(connection, effects.earnings_caregivers)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def track_bulk_statements(orm_execute_state):
+    # Bulk insert()/update()/delete() statements bypass the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            orm_execute_state.session.info.setdefault(
+                'changed_tables', set()).add(mapper.local_table.name)
+
+
+@event.listens_for(Session, 'after_commit')
+def invalidate_changed_tables(session):
+    changed = session.info.pop('changed_tables', None)
+    if changed:
+        facet_cache.invalidate_tables(changed)
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_changed_tables(session):
+    session.info.pop('changed_tables', None)
+
+
+# Per-request SQL profiling: count the statements each request issues and the
+# time spent in the database, report them in a Server-Timing header and log
+# requests slower than SLOW_REQUEST_MS. DEBUG_QUERIES keeps the most recent
+# profiles for /debug/queries.
+SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', '500'))
+SLOWEST_STATEMENTS = 5
+DEBUG_QUERIES = os.getenv('DEBUG_QUERIES', 'false').lower() in ('1', 'true', 'yes')
+recent_profiles = deque(maxlen=int(os.getenv('DEBUG_QUERIES_SIZE', '50')))
+# Routes push their own app context, which replaces flask.g, so the profile
+# of the current request lives in a context variable instead
+current_profile: ContextVar['RequestProfile | None'] = ContextVar('current_profile', default=None)
+
+
+class RequestProfile:
+    """SQL statement count, database time and slowest statements of one request"""
+
+    def __init__(self):
+        self.started = monotonic()
+        self.statement_count = 0
+        self.db_time = 0.0
+        self._slowest = []
+
+    def record(self, statement: str, elapsed: float):
+        self.statement_count += 1
+        self.db_time += elapsed
+        # Min-heap of the slowest statements; the counter breaks ties between equal timings
+        entry = (elapsed, self.statement_count, statement)
+        if len(self._slowest) < SLOWEST_STATEMENTS:
+            heapq.heappush(self._slowest, entry)
+        else:
+            heapq.heappushpop(self._slowest, entry)
+
+    def slowest(self) -> list[tuple[float, str]]:
+        """Slowest statements first, as (milliseconds, sql) pairs"""
+        return [(elapsed * 1000, statement) for elapsed, _, statement in sorted(self._slowest, reverse=True)]
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    context.profile_started = monotonic()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def record_statement(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile.get()
+    if profile is not None:
+        profile.record(statement, monotonic() - context.profile_started)
+
+
+@app.before_request
+def start_request_profile():
+    current_profile.set(RequestProfile())
+
+
+@app.after_request
+def finish_request_profile(response):
+    profile = current_profile.get()
+    if profile is None:
+        return response
+    current_profile.set(None)
+    path = request.full_path.rstrip('?')
+    total_ms = (monotonic() - profile.started) * 1000
+    db_ms = profile.db_time * 1000
+    response.headers.add('Server-Timing', f'db;dur={db_ms:.1f};desc="{profile.statement_count} queries"')
+    response.headers.add('Server-Timing', f'total;dur={total_ms:.1f}')
+    if total_ms >= SLOW_REQUEST_MS:
+        app.logger.warning(
+            'Slow request %s %s: %.1f ms, %d queries, %.1f ms in database. Slowest:\n%s',
+            request.method, path, total_ms, profile.statement_count, db_ms,
+            '\n'.join(f'  {elapsed:.1f} ms  {statement[:300]}' for elapsed, statement in profile.slowest()))
+    if DEBUG_QUERIES and request.endpoint != 'debug_queries':
+        recent_profiles.append({
+            'method': request.method,
+            'path': path,
+            'status': response.status_code,
+            'total_ms': total_ms,
+            'db_ms': db_ms,
+            'statement_count': profile.statement_count,
+            'slowest': profile.slowest(),
+        })
+    return response
+
+
+@app.route('/debug/queries')
+def debug_queries():
+    """Show the SQL profiles of recent requests when DEBUG_QUERIES is enabled"""
+    if not DEBUG_QUERIES:
+        abort(404)
+    return render_template('debug_queries.html', profiles=list(reversed(recent_profiles)))
+
 
 # Flask error handler for database errors
 @app.errorhandler(ProgrammingError)
@@ -202,20 +1095,501 @@ def handle_programming_error(e: ProgrammingError):
     raise
 
 
+# ==================== USER SEARCH ====================
+
+# Phone numbers reduced to digits; PHONE_PATTERN allows only these separators
+FULLTEXT_INDEX = 'ft_users_search'
+_search_backend: str | None = None
+
+
+def search_backend(connection=None) -> str:
+    """
+    Pick the user search implementation once per process:
+    'fulltext' (MySQL FULLTEXT index), 'fts5' (SQLite FTS5 table) or 'like'.
+    """
+    global _search_backend
+    if _search_backend is None:
+        inspector = inspect(connection if connection is not None else db.engine)
+        dialect = inspector.dialect.name
+        if dialect == 'mysql' and any(
+                index['name'] == FULLTEXT_INDEX for index in inspector.get_indexes('users')):
+            _search_backend = 'fulltext'
+        elif dialect == 'sqlite' and inspector.has_table(USERS_SEARCH_TABLE):
+            _search_backend = 'fts5'
+        else:
+            _search_backend = 'like'
+    return _search_backend
+
+
+def search_terms(term: str) -> tuple[list[str], str]:
+    """Split a search term into lowercase words and a phone digit prefix (3+ digits)"""
+    words = re.findall(r'\w+', term.lower())
+    digits = re.sub(r'\D', '', term)
+    return words, digits if len(digits) >= 3 else ''
+
+
+def apply_user_search(query, term: str, backend: str | None = None):
+    """
+    Filter a Users query by a search term - returns (query, rank).
+    Indexed backends match word prefixes on name and email, or a digit prefix
+    on the phone number, and order the results by relevance. The rank is the
+    relevance as a sort key where lower is better, or None when unranked.
+    """
+    backend = backend or search_backend()
+    words, digits = search_terms(term)
+
+    if backend == 'fulltext' and (words or digits):
+        conditions = []
+        rank = None
+        if words:
+            relevance = match(Users.given_name, Users.surname, Users.email,
+                              against=' '.join(f'+{word}*' for word in words)).in_boolean_mode()
+            conditions.append(relevance)
+            rank = -type_coerce(relevance, Float)
+        if digits:
+            conditions.append(literal_column(
+                'users.phone_digits').like(f'{digits}%'))
+        query = query.filter(or_(*conditions))
+        return (query, None) if rank is None else (query.order_by(rank, Users.user_id), rank)
+
+    if backend == 'fts5' and (words or digits):
+        expressions = []
+        if words:
+            expressions.append(' '.join(f'"{word}"*' for word in words))
+        if digits:
+            expressions.append(f'phone_digits : "{digits}"*')
+        ranked = text(
+            f"SELECT rowid AS user_id, bm25({USERS_SEARCH_TABLE}) AS rank "
+            f"FROM {USERS_SEARCH_TABLE} WHERE {USERS_SEARCH_TABLE} MATCH :match_query"
+        ).bindparams(match_query=' OR '.join(f'({e})' for e in expressions)).columns(
+            user_id=Integer, rank=Float).subquery('ranked')
+        return query.join(ranked, ranked.c.user_id == Users.user_id).order_by(
+            ranked.c.rank, Users.user_id), ranked.c.rank
+
+    # Unindexed fallback: case-insensitive substring match
+    search_pattern = f'%{term}%'
+    return query.filter(
+        or_(
+            func.lower(Users.given_name).like(func.lower(search_pattern)),
+            func.lower(Users.surname).like(func.lower(search_pattern)),
+            func.lower(Users.email).like(func.lower(search_pattern)),
+            func.lower(Users.phone_number).like(func.lower(search_pattern))
+        )
+    ), None
+
+
+def rebuild_users_search(connection) -> str:
+    """Create or refresh the search index for the connection's backend - returns the backend"""
+    global _search_backend
+    inspector = inspect(connection)
+    dialect = connection.dialect.name
+    if dialect == 'mysql':
+        columns = {column['name'] for column in inspector.get_columns('users')}
+        if 'phone_digits' not in columns:
+            connection.execute(text(
+                f"ALTER TABLE users ADD COLUMN phone_digits VARCHAR(20) "
+                f"GENERATED ALWAYS AS ({PHONE_DIGITS_SQL}) STORED, "
+                f"ADD INDEX idx_users_phone_digits (phone_digits)"))
+        if not any(index['name'] == FULLTEXT_INDEX for index in inspector.get_indexes('users')):
+            connection.execute(text(
+                f"ALTER TABLE users ADD FULLTEXT INDEX {FULLTEXT_INDEX} (given_name, surname, email)"))
+        _search_backend = 'fulltext'
+    elif dialect == 'sqlite':
+        rebuild_users_search_table(connection)
+        _search_backend = 'fts5'
+    else:
+        _search_backend = 'like'
+    return _search_backend
+
+
+def index_users_search(connection, users: list[dict]):
+    """Add users (user_id, given_name, surname, email, phone_number) to the FTS5 table"""
+    connection.execute(text(
+        f"INSERT INTO {USERS_SEARCH_TABLE} (rowid, given_name, surname, email, phone_digits) "
+        f"VALUES (:user_id, :given_name, :surname, :email, :phone_digits)"
+    ), [{'user_id': user['user_id'], 'given_name': user['given_name'], 'surname': user['surname'],
+         'email': user['email'], 'phone_digits': re.sub(r'\D', '', user['phone_number'])}
+        for user in users])
+
+
+@event.listens_for(Session, 'after_flush')
+def sync_users_search(session, flush_context):
+    # MySQL maintains its FULLTEXT index itself; the SQLite FTS5 table is synced here
+    changed = [instance for instance in chain(session.new, session.dirty, session.deleted)
+               if isinstance(instance, Users)]
+    if not changed or search_backend(session.connection()) != 'fts5':
+        return
+    connection = session.connection()
+    connection.execute(text(
+        f"DELETE FROM {USERS_SEARCH_TABLE} WHERE rowid IN :user_ids"
+    ).bindparams(bindparam('user_ids', expanding=True)),
+        {'user_ids': [user.user_id for user in changed]})
+    current = [user for user in changed if user not in session.deleted]
+    if current:
+        index_users_search(connection, [
+            {'user_id': user.user_id, 'given_name': user.given_name, 'surname': user.surname,
+             'email': user.email, 'phone_number': user.phone_number} for user in current])
+
+
+@app.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Create or refresh the user search index"""
+    with db.engine.begin() as connection:
+        backend = rebuild_users_search(connection)
+    click.echo(f"User search backend: {backend}")
+
+
+# ==================== FILTER FACETS ====================
+
+def person_choices(query) -> list[tuple[int, str]]:
+    """Turn (id, given_name, surname) rows into sorted (id, "Given Surname") tuples"""
+    return sorted((row[0], f"{row[1]} {row[2]}") for row in query)
+
+
+@facet(Users)
+def user_cities() -> list[str]:
+    """Cities of all users"""
+    return sorted(c[0] for c in db.session.query(
+        Users.city).distinct().filter(Users.city.isnot(None)))
+
+
+@facet(Users, Caregiver)
+def caregiver_cities() -> list[str]:
+    """Cities of users who are caregivers"""
+    return sorted(c[0] for c in db.session.query(Users.city).join(
+        Caregiver, Caregiver.caregiver_user_id == Users.user_id
+    ).distinct().filter(Users.city.isnot(None)))
+
+
+@facet(Caregiver)
+def caregiver_genders() -> list[str]:
+    """Genders recorded for caregivers"""
+    return sorted(g[0] for g in db.session.query(
+        Caregiver.gender).distinct().filter(Caregiver.gender.isnot(None)))
+
+
+@facet(Address, Member, Job)
+def job_towns() -> list[str]:
+    """Towns of members who posted jobs"""
+    return sorted(t[0] for t in db.session.query(Address.town).join(
+        Member, Address.member_user_id == Member.member_user_id
+    ).join(Job, Job.member_user_id == Member.member_user_id).distinct())
+
+
+@facet(Users, Member, Job)
+def job_members() -> list[tuple[int, str]]:
+    """Members who posted jobs"""
+    return person_choices(db.session.query(
+        Member.member_user_id, Users.given_name, Users.surname
+    ).join(Users, Member.member_user_id == Users.user_id).join(
+        Job, Job.member_user_id == Member.member_user_id).distinct())
+
+
+@facet(Job)
+def job_dates() -> list[date]:
+    """Dates on which jobs were posted"""
+    return sorted(d[0] for d in db.session.query(Job.date_posted).distinct())
+
+
+@facet(Users, Caregiver, JobApplication)
+def job_application_caregivers() -> list[tuple[int, str]]:
+    """Caregivers who applied to jobs"""
+    return person_choices(db.session.query(
+        Caregiver.caregiver_user_id, Users.given_name, Users.surname
+    ).join(Users, Caregiver.caregiver_user_id == Users.user_id).join(
+        JobApplication, JobApplication.caregiver_user_id == Caregiver.caregiver_user_id
+    ).distinct())
+
+
+@facet(Users, Member, Job, JobApplication)
+def job_application_members() -> list[tuple[int, str]]:
+    """Members whose jobs received applications"""
+    return person_choices(db.session.query(
+        Member.member_user_id, Users.given_name, Users.surname
+    ).join(Users, Member.member_user_id == Users.user_id).join(
+        Job, Job.member_user_id == Member.member_user_id).join(
+        JobApplication, JobApplication.job_id == Job.job_id).distinct())
+
+
+@facet(JobApplication)
+def job_application_job_ids() -> list[int]:
+    """Jobs that received applications"""
+    return sorted(j[0] for j in db.session.query(JobApplication.job_id).distinct())
+
+
+@facet(JobApplication)
+def job_application_dates() -> list[date]:
+    """Dates on which applications were submitted"""
+    return sorted(d[0] for d in db.session.query(JobApplication.date_applied).distinct())
+
+
+@facet(Users, Caregiver, Appointment)
+def appointment_caregivers() -> list[tuple[int, str]]:
+    """Caregivers with appointments"""
+    return person_choices(db.session.query(
+        Caregiver.caregiver_user_id, Users.given_name, Users.surname
+    ).join(Users, Caregiver.caregiver_user_id == Users.user_id).join(
+        Appointment, Appointment.caregiver_user_id == Caregiver.caregiver_user_id
+    ).distinct())
+
+
+@facet(Users, Member, Appointment)
+def appointment_members() -> list[tuple[int, str]]:
+    """Members with appointments"""
+    return person_choices(db.session.query(
+        Member.member_user_id, Users.given_name, Users.surname
+    ).join(Users, Member.member_user_id == Users.user_id).join(
+        Appointment, Appointment.member_user_id == Member.member_user_id
+    ).distinct())
+
+
+@facet(Appointment)
+def appointment_dates() -> list[date]:
+    """Dates with appointments"""
+    return sorted(d[0] for d in db.session.query(Appointment.appointment_date).distinct())
+
+
+# ==================== FORM CHOICES ====================
+
+# Forms embed at most this many <option> elements per picker; larger tables
+# switch the picker to the /api/suggest typeahead
+CHOICE_LIST_LIMIT = int(os.getenv('CHOICE_LIST_LIMIT', '500'))
+SUGGEST_LIMIT = 20
+SUGGEST_MAX_LIMIT = 50
+SUGGEST_MAX_WORDS = 4
+MAX_ID = 2**31 - 1
+
+
+def job_label(job_id: int, given_name: str, surname: str, caregiving_type: str) -> str:
+    """Display name of a job in pickers"""
+    return f"Job {job_id} - {given_name} {surname} ({caregiving_type})"
+
+
+@facet(Users, Member)
+def member_choice_list() -> list[tuple[int, str]]:
+    """All members as (id, name) choices"""
+    return person_choices(db.session.query(
+        Member.member_user_id, Users.given_name, Users.surname
+    ).join(Users, Member.member_user_id == Users.user_id))
+
+
+@facet(Users, Caregiver)
+def caregiver_choice_list() -> list[tuple[int, str]]:
+    """All caregivers as (id, name) choices"""
+    return person_choices(db.session.query(
+        Caregiver.caregiver_user_id, Users.given_name, Users.surname
+    ).join(Users, Caregiver.caregiver_user_id == Users.user_id))
+
+
+@facet(Users, Job)
+def job_choice_list() -> list[tuple[int, str]]:
+    """All jobs as (id, label) choices"""
+    return sorted((row[0], job_label(*row)) for row in db.session.query(
+        Job.job_id, Users.given_name, Users.surname, Job.required_caregiving_type
+    ).join(Users, Job.member_user_id == Users.user_id))
+
+
+# Picker entity -> (choice loader, dashboard_counts key)
+CHOICE_LISTS = {
+    'members': (member_choice_list, 'members'),
+    'caregivers': (caregiver_choice_list, 'caregivers'),
+    'jobs': (job_choice_list, 'jobs'),
+}
+
+
+def choice_list(entity: str, loader=None) -> list | None:
+    """
+    Cached choices for a picker, or None when the entity's table is too large
+    to embed and the picker should use the typeahead instead. Filter bars pass
+    a narrower facet as the loader; forms get every row of the entity.
+    """
+    default_loader, count_key = CHOICE_LISTS[entity]
+    if dashboard_counts()[count_key] > CHOICE_LIST_LIMIT:
+        return None
+    return (loader or default_loader)()
+
+
+def id_prefix_filter(id_column, digits: str):
+    """
+    Match IDs starting with the given digits as a handful of primary key
+    ranges (12 -> 12, 120-129, 1200-1299, ...) instead of a LIKE on a cast.
+    """
+    if digits.startswith('0'):
+        return false()
+    prefix = int(digits)
+    ranges = []
+    scale = 1
+    while prefix * scale <= MAX_ID:
+        ranges.append(id_column.between(prefix * scale, (prefix + 1) * scale - 1))
+        scale *= 10
+    return or_(*ranges) if ranges else false()
+
+
+@app.route('/api/suggest/<entity>')
+@replica_reads
+def suggest(entity):
+    """
+    Typeahead matches for the member, caregiver and job pickers as compact JSON.
+    Numbers match an ID prefix and words match the start of the given name or
+    surname, both through indexes; results are capped at ?limit= (max 50).
+    """
+    if entity == 'members':
+        id_column = Member.member_user_id
+        query = db.session.query(id_column, Users.given_name, Users.surname).join(
+            Users, Member.member_user_id == Users.user_id)
+    elif entity == 'caregivers':
+        id_column = Caregiver.caregiver_user_id
+        query = db.session.query(id_column, Users.given_name, Users.surname).join(
+            Users, Caregiver.caregiver_user_id == Users.user_id)
+    elif entity == 'jobs':
+        id_column = Job.job_id
+        query = db.session.query(id_column, Users.given_name, Users.surname, Job.required_caregiving_type).join(
+            Users, Job.member_user_id == Users.user_id)
+    else:
+        return jsonify({'error': f'Unknown entity: {entity}'}), 404
+
+    limit = request.args.get('limit', SUGGEST_LIMIT, type=int)
+    limit = max(1, min(limit, SUGGEST_MAX_LIMIT))
+    words = re.findall(r'[^\W_]+', request.args.get('q', '')[:100])[:SUGGEST_MAX_WORDS]
+    for word in words:
+        if word.isdigit():
+            query = query.filter(id_prefix_filter(id_column, word))
+        else:
+            query = query.filter(or_(Users.given_name.like(f'{word}%'), Users.surname.like(f'{word}%')))
+
+    rows = query.order_by(id_column).limit(limit).all()
+    if entity == 'jobs':
+        return jsonify([{'id': row[0], 'label': job_label(*row)} for row in rows])
+    return jsonify([{'id': row[0], 'label': f"{row[1]} {row[2]}"} for row in rows])
+
+
+@app.route('/facet-cache/stats')
+def facet_cache_stats():
+    """Expose facet cache hit/miss counters as JSON"""
+    return jsonify(facet_cache.stats())
+
+
+@app.route('/metrics')
+def metrics():
+    """Expose connection pool metrics of the primary and each replica in the Prometheus text format"""
+    lines = []
+
+    def metric(name: str, kind: str, help_text: str, *samples):
+        lines.extend([f'# HELP {name} {help_text}', f'# TYPE {name} {kind}'])
+        lines.extend(f'{name}{suffix} {value}' for suffix, value in samples)
+
+    engines = {'primary': db.engine, **replica_engines}
+    pools = {bind: engine.pool for bind, engine in engines.items() if isinstance(engine.pool, QueuePool)}
+    metric('db_pool_size', 'gauge', 'Configured number of pooled connections',
+           *((f'{{bind="{bind}"}}', pool.size()) for bind, pool in pools.items()))
+    metric('db_pool_checked_out', 'gauge', 'Connections currently in use',
+           *((f'{{bind="{bind}"}}', pool.checkedout()) for bind, pool in pools.items()))
+    metric('db_pool_checked_in', 'gauge', 'Idle connections in the pool',
+           *((f'{{bind="{bind}"}}', pool.checkedin()) for bind, pool in pools.items()))
+    metric('db_pool_overflow', 'gauge', 'Open connections minus pool_size, negative until the pool fills',
+           *((f'{{bind="{bind}"}}', pool.overflow()) for bind, pool in pools.items()))
+
+    stats = {bind: metrics.snapshot() for bind, metrics in pool_metrics.items()}
+    wait_samples = []
+    for bind, snapshot in stats.items():
+        observed = snapshot['checkouts'] + snapshot['timeouts']
+        wait_samples.extend((f'_bucket{{bind="{bind}",le="{bound}"}}', count) for bound, count in snapshot['buckets'])
+        wait_samples.extend([(f'_bucket{{bind="{bind}",le="+Inf"}}', observed),
+                             (f'_sum{{bind="{bind}"}}', f"{snapshot['wait_sum']:.6f}"),
+                             (f'_count{{bind="{bind}"}}', observed)])
+    metric('db_pool_checkout_wait_seconds', 'histogram', 'Time spent waiting for a pooled connection', *wait_samples)
+    metric('db_pool_checkout_wait_max_seconds', 'gauge', 'Longest checkout wait since start',
+           *((f'{{bind="{bind}"}}', f"{snapshot['wait_max']:.6f}") for bind, snapshot in stats.items()))
+    metric('db_pool_checkout_timeouts_total', 'counter', 'Checkouts that gave up after pool_timeout',
+           *((f'{{bind="{bind}"}}', snapshot['timeouts']) for bind, snapshot in stats.items()))
+    metric('db_pool_connects_total', 'counter', 'New database connections opened',
+           *((f'{{bind="{bind}"}}', snapshot['connects']) for bind, snapshot in stats.items()))
+    metric('db_pool_invalidations_total', 'counter', 'Connections discarded as stale or broken',
+           *((f'{{bind="{bind}"}}', snapshot['invalidations']) for bind, snapshot in stats.items()))
+    return '\n'.join(lines) + '\n', 200, {'Content-Type': 'text/plain; version=0.0.4'}
+
+
+@app.cli.command('rebuild-table-stats')
+def rebuild_table_stats_command():
+    """Create table_stats if needed and recount every table into it"""
+    TableStats.__table__.create(db.engine, checkfirst=True)
+    with db.engine.begin() as connection:
+        counts = rebuild_table_stats(connection)
+    _available_tables[TableStats.__tablename__] = True
+    for table, count in counts.items():
+        click.echo(f"{table}: {count}")
+
+
+@app.cli.command('rebuild-caregiver-earnings')
+def rebuild_caregiver_earnings_command():
+    """Create caregiver_earnings if needed and recompute it from the accepted appointments"""
+    CaregiverEarnings.__table__.create(db.engine, checkfirst=True)
+    with db.engine.begin() as connection:
+        caregivers = rebuild_caregiver_earnings(connection)
+    _available_tables[CaregiverEarnings.__tablename__] = True
+    click.echo(f"Rebuilt earnings for {caregivers} caregivers")
+
+
+@app.cli.command('rebuild-job-application-listing')
+def rebuild_job_application_listing_command():
+    """Create job_application_listing if needed and rewrite it from the source tables"""
+    JobApplicationListing.__table__.create(db.engine, checkfirst=True)
+    with db.engine.begin() as connection:
+        rows = rebuild_job_application_listing(connection)
+    _available_tables[JobApplicationListing.__tablename__] = True
+    click.echo(f"Rebuilt {rows} job application rows")
+
+
+@app.cli.command('check-job-application-listing')
+@click.option('--repair', is_flag=True, help='Rewrite the rows of jobs that drifted')
+def check_job_application_listing_command(repair: bool):
+    """Compare job_application_listing with the source tables; exits 1 on drift"""
+    with db.engine.begin() as connection:
+        drift = job_application_listing_drift(connection)
+        for kind, keys in drift.items():
+            click.echo(f"{kind}: {len(keys)}")
+        drifted = set().union(*drift.values())
+        if drifted and repair:
+            rows = rebuild_job_application_listing(connection, job_ids={job_id for _, job_id in drifted})
+            click.echo(f"Repaired {len(drifted)} applications ({rows} rows rewritten)")
+    if drifted and not repair:
+        raise SystemExit(1)
+
+
+def dashboard_counts() -> dict[str, int]:
+    """
+    Row counts for the dashboard from the table_stats counters (one indexed read),
+    falling back to a single SELECT of scalar COUNT(*) subqueries.
+    """
+    tables = {
+        'users': Users,
+        'caregivers': Caregiver,
+        'members': Member,
+        'addresses': Address,
+        'jobs': Job,
+        'appointments': Appointment,
+        'job_applications': JobApplication
+    }
+    if table_stats_available():
+        counters = dict(db.session.execute(
+            select(TableStats.table_name, TableStats.row_count)).all())
+        if all(model.__tablename__ in counters for model in tables.values()):
+            return {key: counters[model.__tablename__] for key, model in tables.items()}
+
+    row = db.session.execute(select(*[
+        select(func.count()).select_from(model).scalar_subquery().label(key)
+        for key, model in tables.items()
+    ])).one()
+    return row._asdict()
+
+
 @app.route('/')
+@replica_reads
 def home():
     """Dashboard home page with statistics"""
     try:
-        # Get statistics (counts are already optimized at database level)
-        stats = {
-            'users': Users.query.count(),
-            'caregivers': Caregiver.query.count(),
-            'members': Member.query.count(),
-            'addresses': Address.query.count(),
-            'jobs': Job.query.count(),
-            'appointments': Appointment.query.count(),
-            'job_applications': JobApplication.query.count()
-        }
+        # Get statistics from the materialized counters
+        stats = dashboard_counts()
 
         recent_users = Users.query.options(
             joinedload(Users.caregiver),
@@ -244,6 +1618,7 @@ def home():
 
 
 @app.route('/users')
+@replica_reads
 def users():
     """Display all users with filtering"""
     # Get filter parameters
@@ -258,17 +1633,9 @@ def users():
     )
 
     # Apply search filter (name, email, or phone number)
-    if search_term and len(search_term) > 0:
-        search_pattern = f'%{search_term}%'
-        # Use LOWER() for case-insensitive search (MySQL compatible)
-        query = query.filter(
-            or_(
-                func.lower(Users.given_name).like(func.lower(search_pattern)),
-                func.lower(Users.surname).like(func.lower(search_pattern)),
-                func.lower(Users.email).like(func.lower(search_pattern)),
-                func.lower(Users.phone_number).like(func.lower(search_pattern))
-            )
-        )
+    rank = None
+    if search_term:
+        query, rank = apply_user_search(query, search_term)
 
     # Apply city filter
     if city_filter:
@@ -296,16 +1663,63 @@ def users():
                 Member.member_user_id == Users.user_id))
         )
 
-    users_list = query.order_by(Users.user_id).all()
-
-    # Get unique cities for filter dropdown (optimized with distinct)
-    cities = sorted([c[0] for c in db.session.query(
-        Users.city).distinct().filter(Users.city.isnot(None)).all()])
-
-    return render_template('users.html', users=users_list, cities=cities, selected_city=city_filter, selected_status=status_filter, search_term=search_term)
+    # Relevance-ranked searches page by (rank, ID); everything else pages by ID
+    if rank is not None:
+        page = keyset_paginate(query, [rank, Users.user_id], select_key=True)
+    else:
+        page = keyset_paginate(query, [Users.user_id])
+
+    # Filter dropdown values come from the facet cache
+    cities = user_cities()
+
+    return render_template('users.html', users=page['items'], page=page, cities=cities, selected_city=city_filter, selected_status=status_filter, search_term=search_term)
+
+
+def caregiver_activity_summary(caregiver_ids: list[int]) -> dict[int, dict]:
+    """
+    Summarize appointments and job applications for the given caregivers.
+    Both tables are stacked with UNION ALL and aggregated in a single GROUP BY,
+    so the list view never joins the two collections into a cartesian product.
+    """
+    if not caregiver_ids:
+        return {}
+
+    activity = union_all(
+        select(
+            Appointment.caregiver_user_id.label('caregiver_user_id'),
+            literal(1).label('appointment'),
+            case((Appointment.status == 'accepted', 1), else_=0).label('accepted'),
+            case((Appointment.status == 'pending', 1), else_=0).label('pending'),
+            Appointment.appointment_date.label('appointment_date'),
+            literal(0).label('application'),
+            cast(null(), Date).label('date_applied')
+        ).where(Appointment.caregiver_user_id.in_(caregiver_ids)),
+        select(
+            JobApplication.caregiver_user_id,
+            literal(0),
+            literal(0),
+            literal(0),
+            cast(null(), Date),
+            literal(1),
+            JobApplication.date_applied
+        ).where(JobApplication.caregiver_user_id.in_(caregiver_ids))
+    ).subquery()
+
+    rows = db.session.execute(select(
+        activity.c.caregiver_user_id,
+        func.sum(activity.c.appointment).label('appointment_count'),
+        func.sum(activity.c.accepted).label('accepted_count'),
+        func.sum(activity.c.pending).label('pending_count'),
+        func.max(activity.c.appointment_date).label('last_appointment_date'),
+        func.sum(activity.c.application).label('application_count'),
+        func.max(activity.c.date_applied).label('last_applied_date')
+    ).group_by(activity.c.caregiver_user_id))
+
+    return {row.caregiver_user_id: row._asdict() for row in rows}
 
 
 @app.route('/caregivers')
+@replica_reads
 def caregivers():
     """Display all caregivers with filtering"""
     # Get filter parameters
@@ -315,12 +1729,8 @@ def caregivers():
     min_rate = request.args.get('min_rate', '')
     max_rate = request.args.get('max_rate', '')
 
-    # Build query with eager loading
-    query = Caregiver.query.options(
-        joinedload(Caregiver.user),
-        joinedload(Caregiver.appointments),
-        joinedload(Caregiver.job_applications)
-    )
+    # Build query; appointments and applications are summarized per page below
+    query = Caregiver.query.options(joinedload(Caregiver.user))
 
     # Apply filters
     if caregiving_type_filter:
@@ -351,18 +1761,18 @@ def caregivers():
         except ValueError:
             pass  # Ignore invalid max_rate values
 
-    caregivers_list = query.order_by(
-        Caregiver.caregiver_user_id).all()
+    page = keyset_paginate(query, [Caregiver.caregiver_user_id])
+    activity = caregiver_activity_summary(
+        [c.caregiver_user_id for c in page['items']])
 
-    # Get unique values for filter dropdowns (optimized with distinct)
-    cities = sorted([c[0] for c in db.session.query(Users.city).join(
-        Caregiver, Caregiver.caregiver_user_id == Users.user_id
-    ).distinct().filter(Users.city.isnot(None)).all()])
-    genders = sorted([g[0] for g in db.session.query(
-        Caregiver.gender).distinct().filter(Caregiver.gender.isnot(None)).all()])
+    # Filter dropdown values come from the facet cache
+    cities = caregiver_cities()
+    genders = caregiver_genders()
 
     return render_template('caregivers.html',
-                           caregivers=caregivers_list,
+                           caregivers=page['items'],
+                           page=page,
+                           activity=activity,
                            caregiving_types=CAREGIVING_TYPES,
                            cities=cities,
                            genders=genders,
@@ -373,28 +1783,73 @@ def caregivers():
                            max_rate=max_rate)
 
 
+@app.route('/caregivers/<int:caregiver_id>/details')
+@replica_reads
+def caregiver_details(caregiver_id):
+    """Return a caregiver's appointments and job applications as JSON"""
+    if not db.session.query(exists().where(Caregiver.caregiver_user_id == caregiver_id)).scalar():
+        return jsonify({'error': 'Caregiver not found.'}), 404
+
+    appointments_rows = db.session.execute(select(
+        Appointment.appointment_id,
+        Appointment.member_user_id,
+        Appointment.appointment_date,
+        Appointment.appointment_time,
+        Appointment.work_hours,
+        Appointment.status
+    ).where(Appointment.caregiver_user_id == caregiver_id).order_by(
+        Appointment.appointment_date.desc(), Appointment.appointment_id.desc()))
+
+    application_rows = db.session.execute(select(
+        JobApplication.job_id,
+        JobApplication.date_applied
+    ).where(JobApplication.caregiver_user_id == caregiver_id).order_by(
+        JobApplication.date_applied.desc(), JobApplication.job_id.desc()))
+
+    return jsonify({
+        'caregiver_user_id': caregiver_id,
+        'appointments': [{
+            'appointment_id': row.appointment_id,
+            'member_user_id': row.member_user_id,
+            'appointment_date': row.appointment_date.isoformat(),
+            'appointment_time': row.appointment_time.strftime('%H:%M'),
+            'work_hours': float(row.work_hours),
+            'status': row.status
+        } for row in appointments_rows],
+        'job_applications': [{
+            'job_id': row.job_id,
+            'date_applied': row.date_applied.isoformat()
+        } for row in application_rows]
+    })
+
+
 @app.route('/members')
+@replica_reads
 def members():
     """Display all members"""
-    members_list = Member.query.options(
+    query = Member.query.options(
         joinedload(Member.user),
         joinedload(Member.address),
-        joinedload(Member.jobs),
-        joinedload(Member.appointments)
-    ).order_by(Member.member_user_id).all()
-    return render_template('members.html', members=members_list)
+        selectinload(Member.jobs),
+        selectinload(Member.appointments)
+    )
+    page = keyset_paginate(query, [Member.member_user_id])
+    return render_template('members.html', members=page['items'], page=page)
 
 
 @app.route('/addresses')
+@replica_reads
 def addresses():
     """Display all addresses"""
-    addresses_list = Address.query.options(
+    query = Address.query.options(
         joinedload(Address.member).joinedload(Member.user)
-    ).order_by(Address.member_user_id).all()
-    return render_template('addresses.html', addresses=addresses_list)
+    )
+    page = keyset_paginate(query, [Address.member_user_id])
+    return render_template('addresses.html', addresses=page['items'], page=page)
 
 
 @app.route('/jobs')
+@replica_reads
 def jobs():
     """Display all jobs with filtering"""
     # Get filter parameters
@@ -408,7 +1863,7 @@ def jobs():
     query = Job.query.options(
         joinedload(Job.member).joinedload(Member.user),
         joinedload(Job.member).joinedload(Member.address),
-        joinedload(Job.applications)
+        selectinload(Job.applications)
     )
 
     # Apply caregiving type filter
@@ -435,26 +1890,16 @@ def jobs():
     query = apply_date_range_filter(
         query, Job.date_posted, from_date, to_date)
 
-    jobs_list = query.order_by(Job.job_id).all()
-
-    # Get unique values for filter dropdowns (optimized with distinct)
-    towns = sorted([t[0] for t in db.session.query(Address.town).join(
-        Member, Address.member_user_id == Member.member_user_id
-    ).join(Job, Job.member_user_id == Member.member_user_id).distinct().all()])
-
-    # Get unique member IDs with names (optimized)
-    member_ids = sorted([(m.member_user_id, f"{u.given_name} {u.surname}")
-                         for m, u in db.session.query(Member, Users).join(
-                             Users, Member.member_user_id == Users.user_id
-    ).join(Job, Job.member_user_id == Member.member_user_id).distinct().all()],
-        key=lambda x: x[0])
+    page = keyset_paginate(query, [Job.job_id])
 
-    # Get unique dates from jobs (optimized with distinct)
-    available_dates = sorted(
-        [d[0] for d in db.session.query(Job.date_posted).distinct().all()])
+    # Filter dropdown values come from the facet cache
+    towns = job_towns()
+    member_ids = job_members()
+    available_dates = job_dates()
 
     return render_template('jobs.html',
-                           jobs=jobs_list,
+                           jobs=page['items'],
+                           page=page,
                            caregiving_types=CAREGIVING_TYPES,
                            towns=towns,
                            member_ids=member_ids,
@@ -466,124 +1911,53 @@ def jobs():
                            to_date=to_date)
 
 
-@app.route('/job-applications')
-def job_applications():
-    """Display all job applications with filtering"""
-    try:
-        with app.app_context():
-            # Get filter parameters
-            caregiving_type_filter = request.args.get('caregiving_type', '')
-            caregiver_id_filter = request.args.get('caregiver_id', '')
-            member_id_filter = request.args.get('member_id', '')
-            job_id_filter = request.args.get('job_id', '')
-            from_date = request.args.get('from_date', '')
-            to_date = request.args.get('to_date', '')
+def filter_job_applications(query, listing):
+    """Apply the job application list filters from the request arguments to the listing"""
+    caregiving_type_filter = request.args.get('caregiving_type', '')
+    caregiver_id_filter = request.args.get('caregiver_id', '')
+    member_id_filter = request.args.get('member_id', '')
+    job_id_filter = request.args.get('job_id', '')
+    from_date = request.args.get('from_date', '')
+    to_date = request.args.get('to_date', '')
 
-            # Build query
-            query = JobApplication.query.options(
-                joinedload(JobApplication.caregiver).joinedload(
-                    Caregiver.user),
-                joinedload(JobApplication.job).joinedload(
-                    Job.member).joinedload(Member.user)
-            )
-
-            # Apply caregiving type filter using subquery
-            if caregiving_type_filter:
-                query = query.filter(
-                    exists(select(1).where(
-                        Job.job_id == JobApplication.job_id,
-                        Job.required_caregiving_type == caregiving_type_filter
-                    ))
-                )
+    # Apply caregiving type filter
+    if caregiving_type_filter:
+        query = query.filter(
+            listing.required_caregiving_type == caregiving_type_filter)
 
-            # Apply caregiver ID filter
-            if caregiver_id_filter:
-                try:
-                    caregiver_id_value = int(caregiver_id_filter)
-                    query = query.filter(
-                        JobApplication.caregiver_user_id == caregiver_id_value)
-                except ValueError:
-                    pass  # Ignore invalid caregiver_id values
+    # Apply caregiver ID filter
+    if caregiver_id_filter:
+        try:
+            caregiver_id_value = int(caregiver_id_filter)
+            query = query.filter(
+                listing.caregiver_user_id == caregiver_id_value)
+        except ValueError:
+            pass  # Ignore invalid caregiver_id values
 
-            # Apply member ID filter using subquery
-            if member_id_filter:
-                try:
-                    member_id_value = int(member_id_filter)
-                    query = query.filter(
-                        exists(select(1).where(
-                            Job.job_id == JobApplication.job_id,
-                            Job.member_user_id == member_id_value
-                        ))
-                    )
-                except ValueError:
-                    pass  # Ignore invalid member_id values
+    # Apply member ID filter
+    if member_id_filter:
+        try:
+            member_id_value = int(member_id_filter)
+            query = query.filter(listing.member_user_id == member_id_value)
+        except ValueError:
+            pass  # Ignore invalid member_id values
 
-            # Apply job ID filter
-            if job_id_filter:
-                try:
-                    job_id_value = int(job_id_filter)
-                    query = query.filter(JobApplication.job_id == job_id_value)
-                except ValueError:
-                    pass  # Ignore invalid job_id values
-
-            # Apply date filters
-            query = apply_date_range_filter(
-                query, JobApplication.date_applied, from_date, to_date)
-
-            applications = query.order_by(
-                JobApplication.date_applied.desc()).all()
-
-            # Get available IDs for dropdowns (optimized with distinct)
-            # Get unique caregiver IDs with names
-            caregiver_ids = sorted([(c.caregiver_user_id, f"{u.given_name} {u.surname}")
-                                   for c, u in db.session.query(Caregiver, Users).join(
-                                       Users, Caregiver.caregiver_user_id == Users.user_id
-            ).join(JobApplication, JobApplication.caregiver_user_id == Caregiver.caregiver_user_id).distinct().all()],
-                key=lambda x: x[0])
-
-            # Get unique member IDs with names
-            member_ids = sorted([(m.member_user_id, f"{u.given_name} {u.surname}")
-                                for m, u in db.session.query(Member, Users).join(
-                                    Users, Member.member_user_id == Users.user_id
-            ).join(Job, Job.member_user_id == Member.member_user_id).join(
-                                    JobApplication, JobApplication.job_id == Job.job_id
-            ).distinct().all()],
-                key=lambda x: x[0])
-
-            # Get unique job IDs
-            job_ids = sorted([j[0] for j in db.session.query(
-                JobApplication.job_id).distinct().all()])
-
-            # Get unique dates from job applications (optimized)
-            available_dates = sorted([d[0] for d in db.session.query(
-                JobApplication.date_applied).distinct().all()])
+    # Apply job ID filter
+    if job_id_filter:
+        try:
+            job_id_value = int(job_id_filter)
+            query = query.filter(listing.job_id == job_id_value)
+        except ValueError:
+            pass  # Ignore invalid job_id values
 
-            return render_template('job_applications.html',
-                                   job_applications=applications,
-                                   caregiving_types=CAREGIVING_TYPES,
-                                   caregiver_ids=caregiver_ids,
-                                   member_ids=member_ids,
-                                   job_ids=job_ids,
-                                   available_dates=available_dates,
-                                   selected_caregiving_type=caregiving_type_filter,
-                                   caregiver_id=caregiver_id_filter,
-                                   member_id=member_id_filter,
-                                   job_id=job_id_filter,
-                                   from_date=from_date,
-                                   to_date=to_date)
-    except ProgrammingError as e:
-        if 'does not exist' in str(e) or 'UndefinedTable' in str(e):
-            return render_template('error.html',
-                                   message='Database tables not found. Please initialize the database first.',
-                                   action_url='/init-db',
-                                   action_text='Initialize Database'), 500
-        raise
+    # Apply date filters
+    query = apply_date_range_filter(
+        query, listing.date_applied, from_date, to_date)
+    return query
 
 
-@app.route('/appointments')
-def appointments():
-    """Display all appointments with filtering"""
-    # Get filter parameters
+def filter_appointments(query):
+    """Apply the appointment list filters from the request arguments"""
     caregiver_id_filter = request.args.get('caregiver_id', '')
     member_id_filter = request.args.get('member_id', '')
     from_date = request.args.get('from_date', '')
@@ -594,13 +1968,6 @@ def appointments():
     max_hours = request.args.get('max_hours', '')
     status_filter = request.args.get('status', '')
 
-    # Build query
-    query = Appointment.query.options(
-        joinedload(Appointment.caregiver).joinedload(
-            Caregiver.user),
-        joinedload(Appointment.member).joinedload(Member.user)
-    )
-
     # Apply caregiver ID filter
     if caregiver_id_filter:
         try:
@@ -652,28 +2019,100 @@ def appointments():
     if status_filter:
         query = query.filter(
             Appointment.status == status_filter)
+    return query
+
+
+@app.route('/job-applications')
+@replica_reads
+def job_applications():
+    """Display all job applications with filtering"""
+    try:
+        with app.app_context():
+            # Get filter parameters
+            caregiving_type_filter = request.args.get('caregiving_type', '')
+            caregiver_id_filter = request.args.get('caregiver_id', '')
+            member_id_filter = request.args.get('member_id', '')
+            job_id_filter = request.args.get('job_id', '')
+            from_date = request.args.get('from_date', '')
+            to_date = request.args.get('to_date', '')
+
+            # Read the denormalized listing instead of joining five tables
+            listing = job_application_listing()
+            query = db.session.query(listing)
+
+            # Apply the list filters
+            query = filter_job_applications(query, listing)
+
+            # Newest first; the composite primary key breaks ties
+            page = keyset_paginate(query, [
+                listing.date_applied,
+                listing.caregiver_user_id,
+                listing.job_id
+            ], descending=True)
+
+            # Filter dropdown values come from the facet cache; large tables use the typeahead
+            caregiver_ids = choice_list('caregivers', job_application_caregivers)
+            member_ids = choice_list('members', job_application_members)
+            job_ids = choice_list('jobs', job_application_job_ids)
+            available_dates = job_application_dates()
+
+            return render_template('job_applications.html',
+                                   job_applications=page['items'],
+                                   page=page,
+                                   caregiving_types=CAREGIVING_TYPES,
+                                   caregiver_ids=caregiver_ids,
+                                   member_ids=member_ids,
+                                   job_ids=job_ids,
+                                   available_dates=available_dates,
+                                   selected_caregiving_type=caregiving_type_filter,
+                                   caregiver_id=caregiver_id_filter,
+                                   member_id=member_id_filter,
+                                   job_id=job_id_filter,
+                                   from_date=from_date,
+                                   to_date=to_date,
+                                   export_args=filter_args())
+    except ProgrammingError as e:
+        if 'does not exist' in str(e) or 'UndefinedTable' in str(e):
+            return render_template('error.html',
+                                   message='Database tables not found. Please initialize the database first.',
+                                   action_url='/init-db',
+                                   action_text='Initialize Database'), 500
+        raise
+
+
+@app.route('/appointments')
+@replica_reads
+def appointments():
+    """Display all appointments with filtering"""
+    # Get filter parameters
+    caregiver_id_filter = request.args.get('caregiver_id', '')
+    member_id_filter = request.args.get('member_id', '')
+    from_date = request.args.get('from_date', '')
+    to_date = request.args.get('to_date', '')
+    from_time = request.args.get('from_time', '')
+    to_time = request.args.get('to_time', '')
+    min_hours = request.args.get('min_hours', '')
+    max_hours = request.args.get('max_hours', '')
+    status_filter = request.args.get('status', '')
 
-    appointments_list = query.order_by(
-        Appointment.appointment_date.desc()).all()
+    # Build query
+    query = Appointment.query.options(
+        joinedload(Appointment.caregiver).joinedload(
+            Caregiver.user),
+        joinedload(Appointment.member).joinedload(Member.user)
+    )
 
-    # Get available values for filter dropdowns (optimized with distinct)
-    # Get unique caregiver IDs with names
-    caregiver_ids = sorted([(c.caregiver_user_id, f"{u.given_name} {u.surname}")
-                           for c, u in db.session.query(Caregiver, Users).join(
-                               Users, Caregiver.caregiver_user_id == Users.user_id
-    ).join(Appointment, Appointment.caregiver_user_id == Caregiver.caregiver_user_id).distinct().all()],
-        key=lambda x: x[0])
+    # Apply the list filters
+    query = filter_appointments(query)
 
-    # Get unique member IDs with names
-    member_ids = sorted([(m.member_user_id, f"{u.given_name} {u.surname}")
-                        for m, u in db.session.query(Member, Users).join(
-                            Users, Member.member_user_id == Users.user_id
-    ).join(Appointment, Appointment.member_user_id == Member.member_user_id).distinct().all()],
-        key=lambda x: x[0])
+    # Newest first; appointment_id breaks ties so the sort key is unique
+    page = keyset_paginate(
+        query, [Appointment.appointment_date, Appointment.appointment_id], descending=True)
 
-    # Get unique dates from appointments (optimized)
-    available_dates = sorted([d[0] for d in db.session.query(
-        Appointment.appointment_date).distinct().all()])
+    # Filter dropdown values come from the facet cache; large tables use the typeahead
+    caregiver_ids = choice_list('caregivers', appointment_caregivers)
+    member_ids = choice_list('members', appointment_members)
+    available_dates = appointment_dates()
 
     # Generate time options with 30-minute intervals (00:00 to 23:30)
     available_times = []
@@ -682,7 +2121,8 @@ def appointments():
             available_times.append(time(hour, minute))
 
     return render_template('appointments.html',
-                           appointments=appointments_list,
+                           appointments=page['items'],
+                           page=page,
                            caregiver_ids=caregiver_ids,
                            member_ids=member_ids,
                            available_dates=available_dates,
@@ -696,7 +2136,780 @@ def appointments():
                            to_time=to_time,
                            min_hours=min_hours,
                            max_hours=max_hours,
-                           selected_status=status_filter)
+                           selected_status=status_filter,
+                           export_args=filter_args())
+
+
+# ==================== JOB MATCHING ====================
+
+# Appointments that count towards a caregiver's current workload
+ACTIVE_APPOINTMENT_STATUSES = ('pending', 'accepted')
+MATCH_LIMIT = 20
+MATCH_MAX_LIMIT = 100
+
+
+class MatchProfile(NamedTuple):
+    """One caregiver as ranked by the matching index"""
+    caregiver_user_id: int
+    name: str
+    city: str
+    caregiving_type: str
+    hourly_rate: Decimal
+    workload: int
+
+    @property
+    def rank_key(self) -> tuple:
+        # Least busy first, then cheapest; the ID keeps the order stable
+        return (self.workload, self.hourly_rate, self.caregiver_user_id)
+
+
+def town_key(town: str | None) -> str:
+    """Normalize a city or town name for comparison"""
+    return (town or '').strip().casefold()
+
+
+class MatchIndex:
+    """
+    In-memory caregiver ranking for job matching, partitioned by caregiving type.
+    Each partition keeps its caregivers sorted by rank both overall and per city,
+    so the matches for a job are the head of its town's list followed by the head
+    of the partition. Committed changes mark caregivers stale and the next lookup
+    reloads only those rows; the whole index is rebuilt once the TTL expires.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # Held while reloading, so concurrent lookups do not each rebuild the index
+        self._refresh_lock = threading.Lock()
+        self._profiles: dict[int, MatchProfile] = {}
+        self._ranked: dict[str, list[tuple]] = {}
+        self._ranked_by_town: dict[tuple[str, str], list[tuple]] = {}
+        self._stale: set[int] = set()
+        self._stale_appointments: set[int] = set()
+        self._expires = 0.0
+        self.rebuilds = 0
+        self.refreshes = 0
+
+    def mark_stale(self, caregiver_ids=(), appointment_ids=()):
+        """Reload these caregivers, and the caregivers of these appointments, on the next lookup"""
+        with self._lock:
+            self._stale.update(caregiver_ids)
+            self._stale_appointments.update(appointment_ids)
+
+    def clear(self):
+        """Rebuild the whole index on the next lookup"""
+        with self._lock:
+            self._expires = 0.0
+
+    @staticmethod
+    def load(session, caregiver_ids=None, appointment_ids=()) -> list[MatchProfile]:
+        """
+        Read caregiver profiles with their upcoming active appointment counts, for
+        every caregiver or only the given ones and those of the given appointments
+        """
+        workload = select(Appointment.caregiver_user_id, func.count().label('workload')).where(
+            Appointment.status.in_(ACTIVE_APPOINTMENT_STATUSES),
+            Appointment.appointment_date >= date.today())
+        query = select(
+            Caregiver.caregiver_user_id, Users.given_name, Users.surname, Users.city,
+            Caregiver.caregiving_type, Caregiver.hourly_rate
+        ).join(Users, Users.user_id == Caregiver.caregiver_user_id)
+        if caregiver_ids is not None:
+            def selected(column):
+                condition = column.in_(caregiver_ids)
+                if appointment_ids:
+                    condition = or_(condition, column.in_(select(Appointment.caregiver_user_id).where(
+                        Appointment.appointment_id.in_(appointment_ids)).scalar_subquery()))
+                return condition
+            workload = workload.where(selected(Appointment.caregiver_user_id))
+            query = query.where(selected(Caregiver.caregiver_user_id))
+        workload = workload.group_by(Appointment.caregiver_user_id).subquery()
+        query = query.add_columns(func.coalesce(workload.c.workload, 0)).outerjoin(
+            workload, workload.c.caregiver_user_id == Caregiver.caregiver_user_id)
+        return [MatchProfile(caregiver_id, f"{given_name} {surname}", city or '', caregiving_type,
+                             hourly_rate, workload_count)
+                for caregiver_id, given_name, surname, city, caregiving_type, hourly_rate, workload_count
+                in session.execute(query)]
+
+    def _add(self, profile: MatchProfile):
+        self._profiles[profile.caregiver_user_id] = profile
+        insort(self._ranked.setdefault(profile.caregiving_type, []), profile.rank_key)
+        insort(self._ranked_by_town.setdefault(
+            (profile.caregiving_type, town_key(profile.city)), []), profile.rank_key)
+
+    def _remove(self, caregiver_id: int):
+        profile = self._profiles.pop(caregiver_id, None)
+        if profile is None:
+            return
+        for ranked in (self._ranked[profile.caregiving_type],
+                       self._ranked_by_town[(profile.caregiving_type, town_key(profile.city))]):
+            del ranked[bisect_left(ranked, profile.rank_key)]
+
+    def _needs_refresh(self) -> bool:
+        return self._expires <= monotonic() or bool(self._stale or self._stale_appointments)
+
+    def ensure_current(self, session):
+        """Rebuild the index when it has expired, otherwise reload the stale caregivers"""
+        with self._lock:
+            if not self._needs_refresh():
+                return
+        # Single flight: one request reloads while the others wait for it, then
+        # find the index current. Caregivers marked stale after the swap below
+        # stay in the stale set for the next lookup.
+        with self._refresh_lock:
+            with self._lock:
+                if not self._needs_refresh():
+                    return
+                expired = self._expires <= monotonic()
+                stale, self._stale = self._stale, set()
+                stale_appointments, self._stale_appointments = self._stale_appointments, set()
+            if expired:
+                with primary_reads():
+                    profiles = self.load(session)
+                profiles_by_id, ranked, ranked_by_town = {}, {}, {}
+                # Sorting once is much cheaper than inserting one by one
+                for profile in sorted(profiles, key=lambda profile: profile.rank_key):
+                    profiles_by_id[profile.caregiver_user_id] = profile
+                    ranked.setdefault(profile.caregiving_type, []).append(profile.rank_key)
+                    ranked_by_town.setdefault(
+                        (profile.caregiving_type, town_key(profile.city)), []).append(profile.rank_key)
+                with self._lock:
+                    self._profiles, self._ranked, self._ranked_by_town = profiles_by_id, ranked, ranked_by_town
+                    self._expires = monotonic() + self.ttl
+                    self.rebuilds += 1
+            else:
+                with primary_reads():
+                    profiles = self.load(session, stale, stale_appointments)
+                with self._lock:
+                    for caregiver_id in stale.union(profile.caregiver_user_id for profile in profiles):
+                        self._remove(caregiver_id)
+                    for profile in profiles:
+                        self._add(profile)
+                    self.refreshes += 1
+
+    def rank(self, caregiving_type: str, town: str | None, limit: int,
+             exclude: set[int] = frozenset()) -> list[tuple[MatchProfile, bool]]:
+        """Best caregivers of a type, those in the given town first, as (profile, same_town) pairs"""
+        town = town_key(town)
+        matches = []
+        with self._lock:
+            for same_town, ranked in ((True, self._ranked_by_town.get((caregiving_type, town), [])),
+                                      (False, self._ranked.get(caregiving_type, []))):
+                for key in ranked:
+                    if len(matches) >= limit:
+                        return matches
+                    profile = self._profiles[key[-1]]
+                    if profile.caregiver_user_id in exclude or (not same_town and town_key(profile.city) == town):
+                        continue
+                    matches.append((profile, same_town))
+        return matches
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'caregivers': len(self._profiles), 'partitions': len(self._ranked),
+                    'stale': len(self._stale), 'rebuilds': self.rebuilds, 'refreshes': self.refreshes}
+
+
+match_index = MatchIndex(ttl=float(os.getenv('MATCH_INDEX_TTL', '300')))
+
+
+# Caregiver, user and appointment changes are collected per transaction and
+# applied to the matching index once it commits
+@event.listens_for(Session, 'after_flush')
+def track_match_changes(session, flush_context):
+    stale = session.info.setdefault('stale_caregivers', set())
+    for instance in chain(session.new, session.dirty, session.deleted):
+        if isinstance(instance, Caregiver):
+            stale.add(instance.caregiver_user_id)
+        elif isinstance(instance, Users) and (instance in session.deleted or any(
+                get_history(instance, key).has_changes() for key in ('given_name', 'surname', 'city'))):
+            stale.add(instance.user_id)
+        elif isinstance(instance, Appointment):
+            # Both the previous and the new caregiver when it was reassigned
+            stale.update(caregiver_id for caregiver_id in get_history(instance, 'caregiver_user_id').sum()
+                         if caregiver_id is not None)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def track_bulk_match_changes(orm_execute_state):
+    # Bulk statements do not say which caregivers they touched, unless the
+    # caller records them itself and says so with match_index_synced
+    if orm_execute_state.execution_options.get('match_index_synced'):
+        return
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ in (Caregiver, Users, Appointment):
+            orm_execute_state.session.info['rebuild_match_index'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def apply_match_changes(session):
+    if session.info.pop('rebuild_match_index', False):
+        match_index.clear()
+    stale = session.info.pop('stale_caregivers', set())
+    stale_appointments = session.info.pop('stale_appointments', set())
+    if stale or stale_appointments:
+        match_index.mark_stale(stale, stale_appointments)
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_match_changes(session):
+    session.info.pop('rebuild_match_index', None)
+    session.info.pop('stale_caregivers', None)
+    session.info.pop('stale_appointments', None)
+
+
+# ==================== BACKGROUND PURGE ====================
+
+# Users, caregivers and members with more history rows (appointments, job
+# applications, jobs) than this are deleted in the background
+PURGE_THRESHOLD = int(os.getenv('PURGE_THRESHOLD', '5000'))
+# History rows a purge deletes per transaction
+PURGE_CHUNK_SIZE = int(os.getenv('PURGE_CHUNK_SIZE', '1000'))
+_purging: set[int] = set()
+_purging_lock = threading.Lock()
+
+
+def purge_steps(model, user_id: int) -> list[tuple[type, object]]:
+    """The history of a user, caregiver or member as (model, condition) pairs, children first"""
+    caregiver = model in (Users, Caregiver)
+    member = model in (Users, Member)
+    steps = [(Appointment, or_(
+        Appointment.caregiver_user_id == user_id if caregiver else false(),
+        Appointment.member_user_id == user_id if member else false()))]
+    if caregiver:
+        steps.append((JobApplication, JobApplication.caregiver_user_id == user_id))
+    if member:
+        steps.append((JobApplication, JobApplication.job_id.in_(
+            select(Job.job_id).where(Job.member_user_id == user_id))))
+        steps.append((Job, Job.member_user_id == user_id))
+    return steps
+
+
+def purge_chunk(child, key, keys: list):
+    """
+    Delete the rows of child with the given primary keys in one statement, and
+    apply what they and their cascade remove to the derived tables
+    """
+    connection = db.session.connection()
+    effects = cascade_effects(connection, {child: set(keys)})
+    # cascade_effects leaves out the rows being deleted; here nothing else counts them
+    effects.counts[child.__tablename__] += len(keys)
+    if child is Appointment:
+        for caregiver_id, status in connection.execute(
+                select(Appointment.caregiver_user_id, Appointment.status).distinct().where(
+                    Appointment.appointment_id.in_(keys))):
+            effects.workload_caregivers.add(caregiver_id)
+            if status == 'accepted':
+                effects.earnings_caregivers.add(caregiver_id)
+    db.session.execute(delete(child).where(key.in_(keys)).execution_options(
+        synchronize_session=False, match_index_synced=True))
+    apply_cascade_effects(db.session, effects)
+
+
+def purge(model, user_id: int) -> int:
+    """
+    Delete the history of a user, caregiver or member PURGE_CHUNK_SIZE rows per
+    transaction, then the row itself, so that no transaction grows with the
+    history. Returns the number of history rows deleted.
+    """
+    purged = 0
+    for child, condition in purge_steps(model, user_id):
+        primary_key = inspect(child).primary_key
+        key = tuple_(*primary_key) if len(primary_key) > 1 else primary_key[0]
+        while True:
+            keys = db.session.execute(select(*primary_key).where(condition).limit(PURGE_CHUNK_SIZE)).all()
+            if not keys:
+                break
+            keys = [tuple(row) if len(primary_key) > 1 else row[0] for row in keys]
+            purge_chunk(child, key, keys)
+            db.session.commit()
+            purged += len(keys)
+    instance = db.session.get(model, user_id)
+    if instance is not None:
+        db.session.delete(instance)
+        db.session.commit()
+    return purged
+
+
+def start_purge(model, user_id: int) -> bool:
+    """Purge in a background thread - returns False when this user is already being purged"""
+    with _purging_lock:
+        if user_id in _purging:
+            return False
+        _purging.add(user_id)
+
+    def run():
+        try:
+            with app.app_context():
+                purged = purge(model, user_id)
+            app.logger.info('Purged %s %d and %d history rows', model.__tablename__, user_id, purged)
+        except Exception:
+            app.logger.exception('Purge of %s %d failed', model.__tablename__, user_id)
+        finally:
+            with _purging_lock:
+                _purging.discard(user_id)
+
+    threading.Thread(target=run, name=f'purge-{model.__tablename__}-{user_id}', daemon=True).start()
+    return True
+
+
+def delete_or_purge(instance, user_id: int) -> str:
+    """
+    Delete a user, caregiver or member, leaving its history to the database
+    cascade, or hand it to a background purge when that history exceeds
+    PURGE_THRESHOLD rows. Returns 'deleted' (the caller commits), 'purging'
+    or 'already purging'.
+    """
+    model = type(instance)
+    deleted = {model: {user_id}}
+    effects = cascade_effects(db.session.connection(), deleted)
+    if effects.history > PURGE_THRESHOLD:
+        db.session.rollback()
+        return 'purging' if start_purge(model, user_id) else 'already purging'
+    db.session.info['measured_cascade'] = (deleted, effects)
+    db.session.delete(instance)
+    return 'deleted'
+
+
+@app.cli.command('purge-user')
+@click.argument('user_id', type=int)
+def purge_user_command(user_id):
+    """Delete a user and their history in chunks, in the foreground"""
+    if db.session.get(Users, user_id) is None:
+        raise click.ClickException(f'User {user_id} does not exist.')
+    purged = purge(Users, user_id)
+    click.echo(f"Deleted user {user_id} and {purged} history rows")
+
+
+# ==================== BULK SIGNUP ====================
+
+# Onboarding bursts create many users at once: each table gets one batched
+# INSERT (multi-row VALUES through insertmanyvalues) for the whole request,
+# instead of a unit of work per signup, and the user IDs come back with RETURNING.
+SIGNUP_LIMIT = int(os.getenv('SIGNUP_LIMIT', '10000'))
+# Emails looked up per statement when the dialect cannot return the IDs
+SIGNUP_LOOKUP_BATCH_SIZE = 1000
+
+
+class Signup(NamedTuple):
+    """A validated user with its optional caregiver, member and address rows"""
+    user: dict
+    caregiver: dict | None = None
+    member: dict | None = None
+    address: dict | None = None
+
+
+def parse_signup(data: dict) -> tuple[Signup | None, str | None]:
+    """Validate one signup like the create forms do - returns (signup, error_message)"""
+    def field(values: dict, name: str) -> str:
+        value = values.get(name)
+        return '' if value is None else str(value).strip()
+
+    email = field(data, 'email')
+    email_valid, error = validate_email(email)
+    if not email_valid:
+        return None, error
+    phone_number = field(data, 'phone_number')
+    phone_valid, error = validate_phone_number(phone_number)
+    if not phone_valid:
+        return None, error
+
+    caregiver = None
+    if data.get('caregiver') is not None:
+        if not isinstance(data['caregiver'], dict):
+            return None, 'Caregiver must be an object.'
+        caregiving_type = field(data['caregiver'], 'caregiving_type')
+        if caregiving_type not in CAREGIVING_TYPES:
+            return None, f'Invalid caregiving type. Must be one of: {", ".join(CAREGIVING_TYPES)}'
+        rate_valid, hourly_rate, error = validate_hourly_rate(field(data['caregiver'], 'hourly_rate'))
+        if not rate_valid:
+            return None, error
+        caregiver = {'photo': field(data['caregiver'], 'photo') or None,
+                     'gender': field(data['caregiver'], 'gender') or None,
+                     'caregiving_type': caregiving_type, 'hourly_rate': hourly_rate}
+
+    member = address = None
+    if data.get('member') is not None:
+        if not isinstance(data['member'], dict):
+            return None, 'Member must be an object.'
+        address = {name: field(data['member'], name) for name in ('house_number', 'street', 'town')}
+        for name, label in (('house_number', 'House number'), ('street', 'Street'), ('town', 'Town')):
+            if not address[name]:
+                return None, f'{label} is required when creating a member.'
+        member = {'house_rules': field(data['member'], 'house_rules') or None,
+                  'dependent_description': field(data['member'], 'dependent_description') or None}
+
+    password = field(data, 'password')
+    password_valid, error = validate_password(password)
+    if not password_valid:
+        return None, error
+
+    user = {'email': email, 'given_name': field(data, 'given_name'), 'surname': field(data, 'surname'),
+            'city': field(data, 'city') or None, 'phone_number': phone_number,
+            'profile_description': field(data, 'profile_description') or None, 'password': password}
+    return Signup(user, caregiver, member, address), None
+
+
+def insert_user_rows(users: list[dict]) -> list[int]:
+    """Insert users in batched multi-row statements - returns their IDs in input order"""
+    # The rows come back keyed by their unique email: asking for them in
+    # parameter order makes SQLAlchemy fall back to one INSERT per row
+    statement = insert(Users).execution_options(match_index_synced=True)
+    emails = [user['email'] for user in users]
+    if db.session.connection().dialect.insert_executemany_returning:
+        user_ids = dict(db.session.execute(statement.returning(Users.email, Users.user_id), users).all())
+    else:
+        # MySQL has no INSERT ... RETURNING: read the IDs back by email
+        db.session.execute(statement, users)
+        user_ids = {}
+        for start in range(0, len(emails), SIGNUP_LOOKUP_BATCH_SIZE):
+            user_ids.update(db.session.execute(select(Users.email, Users.user_id).where(
+                Users.email.in_(emails[start:start + SIGNUP_LOOKUP_BATCH_SIZE]))).all())
+    return [user_ids[email] for email in emails]
+
+
+def insert_signups(signups: list[Signup]) -> list[int]:
+    """
+    Insert signups with one batched INSERT per table in the current transaction -
+    returns the new user IDs in input order. Keeps the row counts, earnings rollup,
+    search index and matching index in step like a flush would.
+    """
+    user_ids = insert_user_rows([signup.user for signup in signups])
+    caregivers = [{**signup.caregiver, 'caregiver_user_id': user_id}
+                  for signup, user_id in zip(signups, user_ids) if signup.caregiver]
+    members = [{**signup.member, 'member_user_id': user_id}
+               for signup, user_id in zip(signups, user_ids) if signup.member]
+    addresses = [{**signup.address, 'member_user_id': user_id}
+                 for signup, user_id in zip(signups, user_ids) if signup.address]
+    for model, rows in ((Caregiver, caregivers), (Member, members), (Address, addresses)):
+        if rows:
+            db.session.execute(insert(model).execution_options(match_index_synced=True), rows)
+
+    connection = db.session.connection()
+    if table_stats_available(connection):
+        adjust_table_stats(connection, {'users': len(signups), 'caregiver': len(caregivers),
+                                        'member': len(members), 'address': len(addresses)})
+    caregiver_ids = [row['caregiver_user_id'] for row in caregivers]
+    if caregiver_ids and table_available(CaregiverEarnings, connection):
+        open_caregiver_earnings(connection, caregiver_ids)
+    if search_backend(connection) == 'fts5':
+        index_users_search(connection, [{**signup.user, 'user_id': user_id}
+                                        for signup, user_id in zip(signups, user_ids)])
+    db.session.info.setdefault('stale_caregivers', set()).update(caregiver_ids)
+    return user_ids
+
+
+@app.route('/api/signups', methods=['POST'])
+def bulk_signup():
+    """
+    Create users from a JSON list of signups in one transaction. Each signup has
+    the create form's user fields plus optional "caregiver" and "member" objects
+    (the member object carries the address). Returns the new user IDs in request
+    order, or every validation error with the index of its signup.
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, list) or not payload:
+        return jsonify({'error': 'Expected a non-empty JSON list of signups.'}), 400
+    if len(payload) > SIGNUP_LIMIT:
+        return jsonify({'error': f'At most {SIGNUP_LIMIT} signups can be created per request.'}), 413
+
+    signups, errors = [], []
+    for index, data in enumerate(payload):
+        signup, error = parse_signup(data) if isinstance(data, dict) else (None, 'Signup must be an object.')
+        if error:
+            errors.append({'index': index, 'error': error})
+        else:
+            signups.append(signup)
+    if errors:
+        return jsonify({'errors': errors}), 400
+
+    try:
+        user_ids = insert_signups(signups)
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        return jsonify({'error': unique_violation_message(e)
+                        or f'Database constraint violation. {str(e.orig)}'}), 409
+    return jsonify({'user_ids': user_ids}), 201
+
+
+# ==================== BULK IMPORT ====================
+
+# Agency onboarding files are streamed in chunks: each chunk is validated,
+# checked against existing emails and phone numbers with one query, inserted
+# through insert_signups() and committed, so memory and transaction size stay
+# bounded however large the file is.
+IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', '5000'))
+IMPORT_FORMATS = ('csv', 'ndjson')
+IMPORT_CAREGIVER_COLUMNS = ('caregiving_type', 'hourly_rate', 'photo', 'gender')
+IMPORT_MEMBER_COLUMNS = ('house_number', 'street', 'town', 'house_rules', 'dependent_description')
+
+
+class ImportReport:
+    """Rows read and imported by an import, with the error of every rejected row"""
+
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.errors: list[tuple[int, str, str]] = []
+
+    def reject(self, line: int, record, error: str):
+        email = record.get('email') if isinstance(record, dict) else None
+        self.errors.append((line, '' if email is None else str(email), error))
+
+    def to_dict(self) -> dict:
+        return {'rows': self.rows, 'imported': self.imported, 'rejected': len(self.errors),
+                'errors': [{'line': line, 'email': email, 'error': error} for line, email, error in self.errors]}
+
+
+def import_format(filename: str | None, requested: str | None = None) -> str:
+    """The format named by the caller, or guessed from the file extension"""
+    if requested:
+        return requested
+    return 'ndjson' if (filename or '').lower().endswith(('.ndjson', '.jsonl')) else 'csv'
+
+
+def read_import_records(stream, file_format: str) -> Iterator[tuple[int, object]]:
+    """Yield (line number, record) from a text stream; NDJSON lines that are not JSON yield their error"""
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            yield line_number, f'Invalid JSON: {e}'
+
+
+def signup_record(record: dict) -> dict:
+    """Nest a flat row's caregiver and member columns like a /api/signups entry"""
+    if 'caregiver' in record or 'member' in record:
+        return record
+    signup = {key: value for key, value in record.items()
+              if key not in IMPORT_CAREGIVER_COLUMNS and key not in IMPORT_MEMBER_COLUMNS}
+    if record.get('caregiving_type') or record.get('hourly_rate'):
+        signup['caregiver'] = {column: record.get(column) for column in IMPORT_CAREGIVER_COLUMNS}
+    if any(record.get(column) for column in IMPORT_MEMBER_COLUMNS):
+        signup['member'] = {column: record.get(column) for column in IMPORT_MEMBER_COLUMNS}
+    return signup
+
+
+def taken_contacts(emails: list[str], phone_numbers: list[str]) -> tuple[set[str], set[str]]:
+    """The emails and phone numbers among these that already belong to users - one query"""
+    rows = db.session.execute(select(Users.email, Users.phone_number).where(
+        or_(Users.email.in_(emails), Users.phone_number.in_(phone_numbers)))).all()
+    return {row.email for row in rows}, {row.phone_number for row in rows}
+
+
+def import_chunk(chunk: list[tuple[int, object]], report: ImportReport):
+    """Validate, deduplicate and insert one chunk of records in its own transaction"""
+    parsed = []
+    for line, record in chunk:
+        if not isinstance(record, dict):
+            report.reject(line, record, record if isinstance(record, str) else 'Record must be an object.')
+            continue
+        signup, error = parse_signup(signup_record(record))
+        if error:
+            report.reject(line, record, error)
+        else:
+            parsed.append((line, signup))
+    if not parsed:
+        return
+
+    taken_emails, taken_phones = taken_contacts([signup.user['email'] for _, signup in parsed],
+                                                [signup.user['phone_number'] for _, signup in parsed])
+    accepted = []
+    for line, signup in parsed:
+        # Checked in order, so a value repeated within the file keeps its first row
+        if signup.user['email'] in taken_emails:
+            report.reject(line, signup.user, USER_UNIQUE_FIELDS['email'])
+        elif signup.user['phone_number'] in taken_phones:
+            report.reject(line, signup.user, USER_UNIQUE_FIELDS['phone_number'])
+        else:
+            taken_emails.add(signup.user['email'])
+            taken_phones.add(signup.user['phone_number'])
+            accepted.append((line, signup))
+    if not accepted:
+        return
+
+    try:
+        insert_signups([signup for _, signup in accepted])
+        db.session.commit()
+        report.imported += len(accepted)
+    except IntegrityError:
+        # A concurrent signup, or a duplicate the database compares differently
+        # (MySQL ignores case): find the offending rows one savepoint at a time
+        db.session.rollback()
+        for line, signup in accepted:
+            try:
+                with db.session.begin_nested():
+                    insert_signups([signup])
+                report.imported += 1
+            except IntegrityError as e:
+                report.reject(line, signup.user, unique_violation_message(e) or str(e.orig))
+        db.session.commit()
+
+
+def import_signups(records: Iterable[tuple[int, object]], chunk_size: int = IMPORT_CHUNK_SIZE) -> ImportReport:
+    """Import users, caregivers and members from (line number, record) pairs, committing per chunk"""
+    report = ImportReport()
+    chunk = []
+    for line, record in records:
+        report.rows += 1
+        chunk.append((line, record))
+        if len(chunk) == chunk_size:
+            import_chunk(chunk, report)
+            chunk = []
+    if chunk:
+        import_chunk(chunk, report)
+    report.errors.sort()
+    return report
+
+
+@app.route('/api/import/users', methods=['POST'])
+def import_users():
+    """
+    Import users, caregivers and members from an uploaded CSV or NDJSON file
+    ("file" field, format from ?format= or the extension). Returns the number of
+    rows imported and the error of every rejected row with its line number.
+    """
+    upload = request.files.get('file')
+    if upload is None:
+        return jsonify({'error': 'Upload the file in the "file" field.'}), 400
+    file_format = import_format(upload.filename, request.args.get('format'))
+    if file_format not in IMPORT_FORMATS:
+        return jsonify({'error': f'Unknown format: {file_format}'}), 400
+    stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+    report = import_signups(read_import_records(stream, file_format))
+    return jsonify(report.to_dict())
+
+
+@app.cli.command('import-users')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'file_format', type=click.Choice(IMPORT_FORMATS), help='Defaults to the file extension')
+@click.option('--errors', 'errors_path', type=click.Path(dir_okay=False), help='Write rejected rows to this CSV file')
+def import_users_command(path, file_format, errors_path):
+    """Import users, caregivers and members from a CSV or NDJSON file"""
+    started = monotonic()
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        report = import_signups(read_import_records(stream, import_format(path, file_format)))
+    elapsed = monotonic() - started
+    click.echo(f"Imported {report.imported} of {report.rows} rows in {elapsed:.1f}s "
+               f"({report.rows / max(elapsed, 1e-9) * 60:,.0f} rows/min), {len(report.errors)} rejected")
+    if errors_path:
+        with open(errors_path, 'w', newline='') as errors_file:
+            writer = csv.writer(errors_file)
+            writer.writerow(['line', 'email', 'error'])
+            writer.writerows(report.errors)
+    else:
+        for line, email, error in report.errors[:20]:
+            click.echo(f"  line {line} {email}: {error}")
+        if len(report.errors) > 20:
+            click.echo(f"  ... {len(report.errors) - 20} more, use --errors to write them all")
+
+
+# ==================== EXPORTS ====================
+
+# Rows fetched per server-side cursor batch; each batch is flushed as one response chunk
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+EXPORT_FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+def export_rows(query, export_format: str) -> Iterator[str]:
+    """Serialize query rows as CSV or NDJSON, yielding one chunk per fetched batch"""
+    columns = [column['name'] for column in query.column_descriptions]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == 'csv':
+        writer.writerow(columns)
+
+    # yield_per streams from a server-side cursor, so only one batch is held in memory
+    for count, row in enumerate(query.yield_per(EXPORT_BATCH_SIZE), 1):
+        if export_format == 'csv':
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(dict(zip(columns, row)), default=str) + '\n')
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def gzip_chunks(chunks: Iterable[str]) -> Iterator[bytes]:
+    """Compress a stream of text chunks incrementally into a single gzip member"""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_response(name: str, query) -> Response:
+    """Stream a query as a CSV or NDJSON download, gzip-compressed when ?gzip=1"""
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        abort(400)
+
+    filename = f'{name}.{export_format}'
+    mimetype = EXPORT_FORMATS[export_format]
+    chunks = export_rows(query, export_format)
+    if request.args.get('gzip') == '1':
+        chunks = gzip_chunks(chunks)
+        filename += '.gz'
+        mimetype = 'application/gzip'
+
+    # stream_with_context keeps the session open while the generator is consumed
+    return Response(stream_with_context(chunks), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+
+@app.route('/export/appointments')
+def export_appointments():
+    """Stream the filtered appointments as CSV or NDJSON"""
+    caregiver_user = aliased(Users)
+    member_user = aliased(Users)
+    query = db.session.query(
+        Appointment.appointment_id,
+        Appointment.appointment_date,
+        Appointment.appointment_time,
+        Appointment.work_hours,
+        Appointment.status,
+        Appointment.caregiver_user_id,
+        caregiver_user.given_name.label('caregiver_given_name'),
+        caregiver_user.surname.label('caregiver_surname'),
+        Caregiver.hourly_rate,
+        (Caregiver.hourly_rate * Appointment.work_hours).label('total_cost'),
+        Appointment.member_user_id,
+        member_user.given_name.label('member_given_name'),
+        member_user.surname.label('member_surname')
+    ).select_from(Appointment).join(
+        Caregiver, Caregiver.caregiver_user_id == Appointment.caregiver_user_id
+    ).join(
+        caregiver_user, caregiver_user.user_id == Appointment.caregiver_user_id
+    ).join(
+        member_user, member_user.user_id == Appointment.member_user_id
+    )
+    query = filter_appointments(query).order_by(Appointment.appointment_id)
+    return export_response('appointments', query)
+
+
+@app.route('/export/job-applications')
+def export_job_applications():
+    """Stream the filtered job applications as CSV or NDJSON"""
+    listing = job_application_listing()
+    query = db.session.query(*[getattr(listing, column.name)
+                               for column in JobApplicationListing.__table__.columns])
+    query = filter_job_applications(query, listing).order_by(
+        listing.caregiver_user_id, listing.job_id)
+    return export_response('job_applications', query)
 
 
 # ==================== USER ROUTES ====================
@@ -719,23 +2932,7 @@ def edit_user(user_id):
                     flash('Phone number is required.', 'error')
                     return render_template('edit_user.html', user=user, caregiving_types=CAREGIVING_TYPES)
 
-                # Check if email is being changed and already exists
-                if new_email != user.email:
-                    existing_email = Users.query.filter(
-                        Users.email == new_email).first()
-                    if existing_email:
-                        flash(
-                            'Email already exists. Please use a different email.', 'error')
-                        return render_template('edit_user.html', user=user, caregiving_types=CAREGIVING_TYPES)
-
-                # Check if phone number is being changed and already exists
-                if new_phone_number != user.phone_number:
-                    existing_phone = Users.query.filter(
-                        Users.phone_number == new_phone_number).first()
-                    if existing_phone:
-                        flash(
-                            'Phone number already exists. Please use a different phone number.', 'error')
-                        return render_template('edit_user.html', user=user, caregiving_types=CAREGIVING_TYPES)
+                # A taken email or phone number is reported by the UNIQUE constraints on commit
 
                 # Check if user wants to be a caregiver or member
                 is_caregiver = request.form.get('is_caregiver') == 'on'
@@ -871,11 +3068,10 @@ def edit_user(user_id):
                                 'dependent_description', '').strip() or None
                         )
                         db.session.add(new_member)
-                        db.session.flush()
 
                         # Create address
                         new_address = Address(
-                            member_user_id=new_member.member_user_id,
+                            member_user_id=user.user_id,
                             house_number=house_number,
                             street=street,
                             town=town
@@ -886,23 +3082,17 @@ def edit_user(user_id):
                     if user.member:
                         db.session.delete(user.member)
 
-                db.session.commit()
+                try:
+                    db.session.commit()
+                except IntegrityError as e:
+                    db.session.rollback()
+                    flash(unique_violation_message(e) or f'Error updating user: {str(e)}', 'error')
+                    return render_template('edit_user.html', user=user, caregiving_types=CAREGIVING_TYPES)
                 flash('User updated successfully!', 'success')
                 return redirect(url_for('users'))
 
             # GET request - load existing caregiver/member data
             return render_template('edit_user.html', user=user, caregiving_types=CAREGIVING_TYPES)
-    except IntegrityError as e:
-        db.session.rollback()
-        error_msg = str(e).lower()
-        if 'email' in error_msg and ('unique' in error_msg or 'duplicate' in error_msg):
-            flash('Email already exists. Please use a different email.', 'error')
-        elif 'phone_number' in error_msg or ('phone' in error_msg and ('unique' in error_msg or 'duplicate' in error_msg)):
-            flash(
-                'Phone number already exists. Please use a different phone number.', 'error')
-        else:
-            flash(f'Error updating user: {str(e)}', 'error')
-        return render_template('edit_user.html', user=user, caregiving_types=CAREGIVING_TYPES)
     except Exception as e:
         db.session.rollback()
         flash(f'Error updating user: {str(e)}', 'error')
@@ -933,17 +3123,7 @@ def create_user():
                     flash(phone_error, 'error')
                     return render_template('create_user.html', caregiving_types=CAREGIVING_TYPES)
 
-                # Check if email already exists
-                is_unique, error_msg = check_email_uniqueness(email)
-                if not is_unique:
-                    flash(error_msg, 'error')
-                    return render_template('create_user.html', caregiving_types=CAREGIVING_TYPES)
-
-                # Check if phone number already exists
-                is_unique, error_msg = check_phone_uniqueness(phone_number)
-                if not is_unique:
-                    flash(error_msg, 'error')
-                    return render_template('create_user.html', caregiving_types=CAREGIVING_TYPES)
+                # A taken email or phone number is reported by the UNIQUE constraints on commit
 
                 # Check if user wants to be a caregiver or member
                 is_caregiver = request.form.get('is_caregiver') == 'on'
@@ -983,6 +3163,25 @@ def create_user():
                         flash('Hourly rate must be a valid number.', 'error')
                         return render_template('create_user.html', caregiving_types=CAREGIVING_TYPES)
 
+                # Validate address fields (required for member)
+                if is_member:
+                    house_number = request.form.get('house_number', '').strip()
+                    street = request.form.get('street', '').strip()
+                    town = request.form.get('town', '').strip()
+
+                    if not house_number:
+                        flash(
+                            'House number is required when creating a member.', 'error')
+                        return render_template('create_user.html', caregiving_types=CAREGIVING_TYPES)
+
+                    if not street:
+                        flash('Street is required when creating a member.', 'error')
+                        return render_template('create_user.html', caregiving_types=CAREGIVING_TYPES)
+
+                    if not town:
+                        flash('Town is required when creating a member.', 'error')
+                        return render_template('create_user.html', caregiving_types=CAREGIVING_TYPES)
+
                 # Validate password
                 password = request.form.get('password', '').strip()
                 password_valid, password_error = validate_password(password)
@@ -1001,139 +3200,41 @@ def create_user():
                         'profile_description', '').strip() or None,
                     password=password
                 )
+                # Related rows hang off the user, so one flush inserts them all
+                # and fills in the keys without a round trip per table
                 db.session.add(new_user)
-                db.session.flush()  # Flush to get the user_id
 
                 # Create caregiver if selected
                 if is_caregiver:
-                    new_caregiver = Caregiver(
-                        caregiver_user_id=new_user.user_id,
+                    new_user.caregiver = Caregiver(
                         photo=request.form.get('photo', '').strip() or None,
                         gender=request.form.get('gender', '').strip() or None,
                         caregiving_type=caregiving_type,
                         hourly_rate=hourly_rate_value
                     )
-                    db.session.add(new_caregiver)
 
-                # Create member if selected
+                # Create member and its address (required for member) if selected
                 if is_member:
-                    # Validate address fields (required for member)
-                    house_number = request.form.get('house_number', '').strip()
-                    street = request.form.get('street', '').strip()
-                    town = request.form.get('town', '').strip()
-
-                    if not house_number:
-                        flash(
-                            'House number is required when creating a member.', 'error')
-                        return render_template('create_user.html', caregiving_types=CAREGIVING_TYPES)
-
-                    if not street:
-                        flash('Street is required when creating a member.', 'error')
-                        return render_template('create_user.html', caregiving_types=CAREGIVING_TYPES)
-
-                    if not town:
-                        flash('Town is required when creating a member.', 'error')
-                        return render_template('create_user.html', caregiving_types=CAREGIVING_TYPES)
-
-                    new_member = Member(
-                        member_user_id=new_user.user_id,
+                    new_user.member = Member(
                         house_rules=request.form.get(
                             'house_rules', '').strip() or None,
                         dependent_description=request.form.get(
-                            'dependent_description', '').strip() or None
-                    )
-                    db.session.add(new_member)
-                    db.session.flush()  # Flush to get the member_user_id
-
-                    # Create address (required for member)
-                    new_address = Address(
-                        member_user_id=new_member.member_user_id,
-                        house_number=house_number,
-                        street=street,
-                        town=town
+                            'dependent_description', '').strip() or None,
+                        address=Address(
+                            house_number=house_number,
+                            street=street,
+                            town=town
+                        )
                     )
-                    db.session.add(new_address)
 
-                try:
-                    db.session.commit()
-                    # Reset the sequence to the max user_id to prevent future conflicts
-                    reset_user_sequence()
-                    flash('User created successfully!', 'success')
-                    return redirect(url_for('users'))
-                except IntegrityError as ie:
-                    db.session.rollback()
-                    error_str = str(ie).lower()
-                    # Check if it's a primary key sequence issue
-                    if 'users_pkey' in error_str or ('user_id' in error_str and 'already exists' in error_str):
-                        # Fix the sequence and retry
-                        reset_user_sequence()
-                        # Retry creating the user and related records
-                        db.session.add(new_user)
-                        db.session.flush()
-
-                        # Recreate caregiver if needed
-                        if is_caregiver:
-                            retry_caregiver = Caregiver(
-                                caregiver_user_id=new_user.user_id,
-                                photo=request.form.get(
-                                    'photo', '').strip() or None,
-                                gender=request.form.get(
-                                    'gender', '').strip() or None,
-                                caregiving_type=caregiving_type,
-                                hourly_rate=hourly_rate_value
-                            )
-                            db.session.add(retry_caregiver)
-
-                        # Recreate member if needed
-                        if is_member:
-                            # Get address fields (required for member)
-                            house_number = request.form.get(
-                                'house_number', '').strip()
-                            street = request.form.get('street', '').strip()
-                            town = request.form.get('town', '').strip()
-
-                            retry_member = Member(
-                                member_user_id=new_user.user_id,
-                                house_rules=request.form.get(
-                                    'house_rules', '').strip() or None,
-                                dependent_description=request.form.get(
-                                    'dependent_description', '').strip() or None
-                            )
-                            db.session.add(retry_member)
-                            db.session.flush()
-
-                            # Recreate address (required for member)
-                            retry_address = Address(
-                                member_user_id=retry_member.member_user_id,
-                                house_number=house_number,
-                                street=street,
-                                town=town
-                            )
-                            db.session.add(retry_address)
-
-                        db.session.commit()
-                        # Reset sequence again after successful creation
-                        reset_user_sequence()
-                        flash('User created successfully!', 'success')
-                        return redirect(url_for('users'))
-                    raise  # Re-raise if it's a different IntegrityError
+                db.session.commit()
+                flash('User created successfully!', 'success')
+                return redirect(url_for('users'))
             return render_template('create_user.html', caregiving_types=CAREGIVING_TYPES)
     except IntegrityError as e:
         db.session.rollback()
-        # Check if it's an email or phone number constraint violation
-        error_msg = str(e).lower()
-        if 'email' in error_msg and ('unique' in error_msg or 'duplicate' in error_msg):
-            flash(
-                'Email already exists in the database. Please use a different email.', 'error')
-        elif 'phone_number' in error_msg or ('phone' in error_msg and ('unique' in error_msg or 'duplicate' in error_msg)):
-            flash(
-                'Phone number already exists in the database. Please use a different phone number.', 'error')
-        elif 'unique' in error_msg or 'duplicate' in error_msg:
-            flash(
-                'A field with this value already exists. Please check email and phone number.', 'error')
-        else:
-            flash(
-                f'Error creating user: Database constraint violation. {str(e)}', 'error')
+        flash(unique_violation_message(e)
+              or f'Error creating user: Database constraint violation. {str(e)}', 'error')
         return render_template('create_user.html', caregiving_types=CAREGIVING_TYPES)
     except Exception as e:
         db.session.rollback()
@@ -1147,9 +3248,14 @@ def delete_user(user_id):
     try:
         with app.app_context():
             user = Users.query.get_or_404(user_id)
-            db.session.delete(user)
-            db.session.commit()
-            flash('User deleted successfully!', 'success')
+            outcome = delete_or_purge(user, user_id)
+            if outcome == 'deleted':
+                db.session.commit()
+                flash('User deleted successfully!', 'success')
+            elif outcome == 'purging':
+                flash('User has a long history and is being deleted in the background.', 'success')
+            else:
+                flash('User is already being deleted in the background.', 'error')
     except IntegrityError:
         db.session.rollback()
         flash('Cannot delete user: User has related records (caregiver/member).', 'error')
@@ -1185,21 +3291,7 @@ def create_caregiver():
                     flash(phone_error, 'error')
                     return render_template('create_caregiver.html', caregiving_types=CAREGIVING_TYPES)
 
-                # Check if email already exists
-                existing_user = Users.query.filter(
-                    Users.email == email).first()
-                if existing_user:
-                    flash(
-                        'Email already exists. Please use a different email.', 'error')
-                    return render_template('create_caregiver.html', caregiving_types=CAREGIVING_TYPES)
-
-                # Check if phone number already exists
-                existing_phone = Users.query.filter(
-                    Users.phone_number == phone_number).first()
-                if existing_phone:
-                    flash(
-                        'Phone number already exists. Please use a different phone number.', 'error')
-                    return render_template('create_caregiver.html', caregiving_types=CAREGIVING_TYPES)
+                # A taken email or phone number is reported by the UNIQUE constraints on commit
 
                 # Validate caregiver-specific fields
                 caregiving_type = request.form.get(
@@ -1244,45 +3336,23 @@ def create_caregiver():
                     password=password
                 )
                 db.session.add(new_user)
-                db.session.flush()  # Flush to get the user_id
 
-                # Create new caregiver
-                new_caregiver = Caregiver(
-                    caregiver_user_id=new_user.user_id,
+                # Create new caregiver - inserted in the same flush as its user
+                new_user.caregiver = Caregiver(
                     photo=request.form.get('photo', '').strip() or None,
                     gender=request.form.get('gender', '').strip() or None,
                     caregiving_type=caregiving_type,
                     hourly_rate=hourly_rate_value
                 )
-                db.session.add(new_caregiver)
 
                 try:
                     db.session.commit()
-                    # Reset the sequence to the max user_id to prevent future conflicts
-                    reset_user_sequence()
                     flash('Caregiver created successfully!', 'success')
                     return redirect(url_for('caregivers'))
                 except IntegrityError as ie:
                     db.session.rollback()
-                    error_str = str(ie).lower()
-                    # Check if it's a primary key sequence issue
-                    if 'users_pkey' in error_str or ('user_id' in error_str and 'already exists' in error_str):
-                        reset_user_sequence()
-                        flash(
-                            'Error creating caregiver: Primary key conflict. Please try again. Sequence was reset.', 'error')
-                        return render_template('create_caregiver.html', caregiving_types=CAREGIVING_TYPES)
-                    elif 'email' in error_str and ('unique' in error_str or 'duplicate' in error_str):
-                        flash(
-                            'Email already exists in the database. Please use a different email.', 'error')
-                    elif 'phone_number' in error_str or ('phone' in error_str and ('unique' in error_str or 'duplicate' in error_str)):
-                        flash(
-                            'Phone number already exists in the database. Please use a different phone number.', 'error')
-                    elif 'unique' in error_str or 'duplicate' in error_str:
-                        flash(
-                            'A field with this value already exists. Please check email and phone number.', 'error')
-                    else:
-                        flash(
-                            f'Error creating caregiver: Database constraint violation. {str(ie)}', 'error')
+                    flash(unique_violation_message(ie)
+                          or f'Error creating caregiver: Database constraint violation. {str(ie)}', 'error')
                     return render_template('create_caregiver.html', caregiving_types=CAREGIVING_TYPES)
 
             return render_template('create_caregiver.html', caregiving_types=CAREGIVING_TYPES)
@@ -1346,9 +3416,14 @@ def delete_caregiver(caregiver_id):
     try:
         with app.app_context():
             caregiver = Caregiver.query.get_or_404(caregiver_id)
-            db.session.delete(caregiver)
-            db.session.commit()
-            flash('Caregiver deleted successfully!', 'success')
+            outcome = delete_or_purge(caregiver, caregiver_id)
+            if outcome == 'deleted':
+                db.session.commit()
+                flash('Caregiver deleted successfully!', 'success')
+            elif outcome == 'purging':
+                flash('Caregiver has a long history and is being deleted in the background.', 'success')
+            else:
+                flash('Caregiver is already being deleted in the background.', 'error')
     except IntegrityError:
         db.session.rollback()
         flash('Cannot delete caregiver: Caregiver has related records.', 'error')
@@ -1384,21 +3459,7 @@ def create_member():
                     flash(phone_error, 'error')
                     return render_template('create_member.html')
 
-                # Check if email already exists
-                existing_user = Users.query.filter(
-                    Users.email == email).first()
-                if existing_user:
-                    flash(
-                        'Email already exists. Please use a different email.', 'error')
-                    return render_template('create_member.html')
-
-                # Check if phone number already exists
-                existing_phone = Users.query.filter(
-                    Users.phone_number == phone_number).first()
-                if existing_phone:
-                    flash(
-                        'Phone number already exists. Please use a different phone number.', 'error')
-                    return render_template('create_member.html')
+                # A taken email or phone number is reported by the UNIQUE constraints on commit
 
                 # Validate member address fields (required)
                 house_number = request.form.get('house_number', '').strip()
@@ -1436,55 +3497,29 @@ def create_member():
                     password=password
                 )
                 db.session.add(new_user)
-                db.session.flush()  # Flush to get the user_id
 
-                # Create new member
-                new_member = Member(
-                    member_user_id=new_user.user_id,
+                # Create new member and its address (required for member) -
+                # inserted in the same flush as their user
+                new_user.member = Member(
                     house_rules=request.form.get(
                         'house_rules', '').strip() or None,
                     dependent_description=request.form.get(
-                        'dependent_description', '').strip() or None
-                )
-                db.session.add(new_member)
-                db.session.flush()  # Flush to get the member_user_id
-
-                # Create address (required for member)
-                new_address = Address(
-                    member_user_id=new_member.member_user_id,
-                    house_number=house_number,
-                    street=street,
-                    town=town
+                        'dependent_description', '').strip() or None,
+                    address=Address(
+                        house_number=house_number,
+                        street=street,
+                        town=town
+                    )
                 )
-                db.session.add(new_address)
 
                 try:
                     db.session.commit()
-                    # Reset the sequence to the max user_id to prevent future conflicts
-                    reset_user_sequence()
                     flash('Member created successfully!', 'success')
                     return redirect(url_for('members'))
                 except IntegrityError as ie:
                     db.session.rollback()
-                    error_str = str(ie).lower()
-                    # Check if it's a primary key sequence issue
-                    if 'users_pkey' in error_str or ('user_id' in error_str and 'already exists' in error_str):
-                        reset_user_sequence()
-                        flash(
-                            'Error creating member: Primary key conflict. Please try again. Sequence was reset.', 'error')
-                        return render_template('create_member.html')
-                    elif 'email' in error_str and ('unique' in error_str or 'duplicate' in error_str):
-                        flash(
-                            'Email already exists in the database. Please use a different email.', 'error')
-                    elif 'phone_number' in error_str or ('phone' in error_str and ('unique' in error_str or 'duplicate' in error_str)):
-                        flash(
-                            'Phone number already exists in the database. Please use a different phone number.', 'error')
-                    elif 'unique' in error_str or 'duplicate' in error_str:
-                        flash(
-                            'A field with this value already exists. Please check email and phone number.', 'error')
-                    else:
-                        flash(
-                            f'Error creating member: Database constraint violation. {str(ie)}', 'error')
+                    flash(unique_violation_message(ie)
+                          or f'Error creating member: Database constraint violation. {str(ie)}', 'error')
                     return render_template('create_member.html')
 
             return render_template('create_member.html')
@@ -1557,9 +3592,14 @@ def delete_member(member_id):
     try:
         with app.app_context():
             member = Member.query.get_or_404(member_id)
-            db.session.delete(member)
-            db.session.commit()
-            flash('Member deleted successfully!', 'success')
+            outcome = delete_or_purge(member, member_id)
+            if outcome == 'deleted':
+                db.session.commit()
+                flash('Member deleted successfully!', 'success')
+            elif outcome == 'purging':
+                flash('Member has a long history and is being deleted in the background.', 'success')
+            else:
+                flash('Member is already being deleted in the background.', 'error')
     except IntegrityError:
         db.session.rollback()
         flash('Cannot delete member: Member has related records.', 'error')
@@ -1615,13 +3655,8 @@ def create_job():
     """Create a new job"""
     try:
         with app.app_context():
-            # Get all members for dropdown
-            all_members = Member.query.options(
-                joinedload(Member.user)
-            ).all()
-            member_choices = [(m.member_user_id, f"{m.user.given_name} {m.user.surname}")
-                              for m in all_members]
-            member_choices.sort(key=lambda x: x[0])  # Sort by ID
+            # Cached choices for the member picker (None switches it to the typeahead)
+            member_choices = choice_list('members')
 
             if request.method == 'POST':
                 # Validate member selection
@@ -1783,6 +3818,35 @@ def delete_job(job_id):
     return redirect(url_for('jobs'))
 
 
+@app.route('/jobs/<int:job_id>/matches')
+@replica_reads
+def job_matches(job_id):
+    """Rank the caregivers best suited to a job that have not applied to it yet"""
+    job = Job.query.options(
+        joinedload(Job.member).joinedload(Member.user),
+        joinedload(Job.member).joinedload(Member.address)
+    ).get_or_404(job_id)
+    town = job.member.address.town if job.member.address else None
+    # The listing is indexed by job; job_application is keyed by caregiver first
+    applications = JobApplicationListing if table_available(JobApplicationListing) else JobApplication
+    applied = set(db.session.scalars(
+        select(applications.caregiver_user_id).where(applications.job_id == job_id)))
+
+    limit = request.args.get('limit', MATCH_LIMIT, type=int)
+    limit = max(1, min(limit, MATCH_MAX_LIMIT))
+    match_index.ensure_current(db.session)
+    # Members who are also caregivers are never matched to their own job
+    matches = match_index.rank(job.required_caregiving_type, town, limit,
+                               exclude=applied | {job.member_user_id})
+
+    return render_template('job_matches.html',
+                           job=job,
+                           town=town,
+                           matches=matches,
+                           applied_count=len(applied),
+                           today=date.today().isoformat())
+
+
 # ==================== JOB APPLICATION ROUTES ====================
 
 @app.route('/job-applications/create', methods=['GET', 'POST'])
@@ -1790,21 +3854,11 @@ def create_job_application():
     """Create a new job application"""
     try:
         with app.app_context():
-            # Get all caregivers for dropdown
-            all_caregivers = Caregiver.query.options(
-                joinedload(Caregiver.user)
-            ).all()
-            caregiver_choices = [(c.caregiver_user_id, f"{c.user.given_name} {c.user.surname}")
-                                 for c in all_caregivers]
-            caregiver_choices.sort(key=lambda x: x[0])  # Sort by ID
-
-            # Get all jobs for dropdown
-            all_jobs = Job.query.options(
-                joinedload(Job.member).joinedload(Member.user)
-            ).all()
-            job_choices = [(j.job_id, f"Job {j.job_id} - {j.member.user.given_name} {j.member.user.surname} ({j.required_caregiving_type})")
-                           for j in all_jobs]
-            job_choices.sort(key=lambda x: x[0])  # Sort by ID
+            # Cached choices for the caregiver picker (None switches it to the typeahead)
+            caregiver_choices = choice_list('caregivers')
+
+            # Cached choices for the job picker (None switches it to the typeahead)
+            job_choices = choice_list('jobs')
 
             if request.method == 'POST':
                 # Validate caregiver selection
@@ -1950,21 +4004,11 @@ def create_appointment():
     """Create a new appointment"""
     try:
         with app.app_context():
-            # Get all caregivers for dropdown
-            all_caregivers = Caregiver.query.options(
-                joinedload(Caregiver.user)
-            ).all()
-            caregiver_choices = [(c.caregiver_user_id, f"{c.user.given_name} {c.user.surname}")
-                                 for c in all_caregivers]
-            caregiver_choices.sort(key=lambda x: x[0])  # Sort by ID
-
-            # Get all members for dropdown
-            all_members = Member.query.options(
-                joinedload(Member.user)
-            ).all()
-            member_choices = [(m.member_user_id, f"{m.user.given_name} {m.user.surname}")
-                              for m in all_members]
-            member_choices.sort(key=lambda x: x[0])  # Sort by ID
+            # Cached choices for the caregiver picker (None switches it to the typeahead)
+            caregiver_choices = choice_list('caregivers')
+
+            # Cached choices for the member picker (None switches it to the typeahead)
+            member_choices = choice_list('members')
 
             if request.method == 'POST':
                 # Validate caregiver selection
@@ -2072,6 +4116,15 @@ def create_appointment():
                                            caregiver_choices=caregiver_choices,
                                            member_choices=member_choices)
 
+                # Check that the caregiver is free for the whole slot
+                is_free, overlap_msg = check_appointment_overlap(
+                    caregiver_id_value, appointment_date_value, appointment_time_value, work_hours_value)
+                if not is_free:
+                    flash(overlap_msg, 'error')
+                    return render_template('create_appointment.html',
+                                           caregiver_choices=caregiver_choices,
+                                           member_choices=member_choices)
+
                 # Create new appointment (status defaults to 'pending' in the model)
                 new_appointment = Appointment(
                     caregiver_user_id=caregiver_id_value,
@@ -2196,6 +4249,18 @@ def edit_appointment(appointment_id):
                                            appointment=appointment,
                                            appointment_statuses=APPOINTMENT_STATUSES)
 
+                # Declined appointments free the slot; others must not overlap
+                if status != 'declined':
+                    is_free, overlap_msg = check_appointment_overlap(
+                        appointment.caregiver_user_id, appointment.appointment_date,
+                        appointment.appointment_time, appointment.work_hours,
+                        exclude_appointment_id=appointment.appointment_id)
+                    if not is_free:
+                        flash(overlap_msg, 'error')
+                        return render_template('edit_appointment.html',
+                                               appointment=appointment,
+                                               appointment_statuses=APPOINTMENT_STATUSES)
+
                 appointment.status = status
                 db.session.commit()
                 flash('Appointment updated successfully!', 'success')
@@ -2209,39 +4274,102 @@ def edit_appointment(appointment_id):
         return redirect(url_for('appointments'))
 
 
-@app.route('/appointments/<int:appointment_id>/accept', methods=['POST'])
-def accept_appointment(appointment_id):
-    """Accept an appointment (change status to accepted)"""
+# Most appointments one bulk accept/decline may change
+BULK_STATUS_LIMIT = int(os.getenv('BULK_STATUS_LIMIT', '500'))
+
+
+def transition_appointments(appointment_ids: list[int], status: str) -> int:
+    """
+    Move the pending appointments among appointment_ids to status with one
+    conditional UPDATE, and return how many changed. The caller commits.
+    """
+    pending = (Appointment.appointment_id.in_(appointment_ids), Appointment.status == 'pending')
+    connection = db.session.connection()
+    hours = Counter()
+    counts = Counter()
+    track_earnings = status == 'accepted' and table_available(CaregiverEarnings, connection)
+    if track_earnings:
+        # Accepted hours grow by the appointments leaving pending, summed per caregiver
+        for caregiver_id, caregiver_hours, caregiver_count in db.session.execute(select(
+                Appointment.caregiver_user_id, func.sum(Appointment.work_hours), func.count()
+        ).where(*pending).group_by(Appointment.caregiver_user_id)):
+            hours[caregiver_id] = caregiver_hours
+            counts[caregiver_id] = caregiver_count
+    changed = db.session.execute(
+        update(Appointment)
+        .where(*pending)
+        .values(status=status)
+        .execution_options(synchronize_session=False, match_index_synced=True)
+    ).rowcount
+    if not changed:
+        return 0
+    if status != 'accepted':
+        # Declined appointments no longer count towards their caregivers' workload
+        db.session.info.setdefault('stale_appointments', set()).update(appointment_ids)
+    elif track_earnings:
+        if changed == counts.total():
+            missing = add_caregiver_earnings(connection, hours, counts)
+        else:
+            # A concurrent transition moved some of them first; recount these caregivers
+            missing = set(counts)
+        if missing:
+            rebuild_caregiver_earnings(connection, missing)
+    return changed
+
+
+def transition_appointment(appointment_id: int, status: str):
+    """Flash the outcome of moving one pending appointment to status"""
     try:
         with app.app_context():
-            appointment = Appointment.query.get_or_404(appointment_id)
-            if appointment.status != 'pending':
-                flash('Only pending appointments can be accepted.', 'error')
-            else:
-                appointment.status = 'accepted'
+            if transition_appointments([appointment_id], status):
                 db.session.commit()
-                flash('Appointment accepted successfully!', 'success')
+                flash(f'Appointment {status} successfully!', 'success')
+            # Nothing changed: look up why, which only costs a query on this path
+            elif db.session.get(Appointment, appointment_id) is None:
+                flash('Appointment not found.', 'error')
+            else:
+                flash(f'Only pending appointments can be {status}.', 'error')
     except Exception as e:
         db.session.rollback()
-        flash(f'Error accepting appointment: {str(e)}', 'error')
+        flash(f'Error updating appointment: {str(e)}', 'error')
     return redirect(url_for('appointments'))
 
 
+@app.route('/appointments/<int:appointment_id>/accept', methods=['POST'])
+def accept_appointment(appointment_id):
+    """Accept an appointment (change status to accepted)"""
+    return transition_appointment(appointment_id, 'accepted')
+
+
 @app.route('/appointments/<int:appointment_id>/decline', methods=['POST'])
 def decline_appointment(appointment_id):
     """Decline an appointment (change status to declined)"""
-    try:
-        with app.app_context():
-            appointment = Appointment.query.get_or_404(appointment_id)
-            if appointment.status != 'pending':
-                flash('Only pending appointments can be declined.', 'error')
-            else:
-                appointment.status = 'declined'
+    return transition_appointment(appointment_id, 'declined')
+
+
+@app.route('/appointments/bulk-status', methods=['POST'])
+def bulk_appointment_status():
+    """Accept or decline every selected pending appointment in one statement"""
+    status = request.form.get('status', '')
+    appointment_ids = sorted({int(value) for value in request.form.getlist('appointment_ids') if value.isdigit()})
+    if status not in ('accepted', 'declined'):
+        flash('Choose whether to accept or decline the selected appointments.', 'error')
+    elif not appointment_ids:
+        flash('Select at least one appointment.', 'error')
+    elif len(appointment_ids) > BULK_STATUS_LIMIT:
+        flash(f'Select at most {BULK_STATUS_LIMIT} appointments at a time.', 'error')
+    else:
+        try:
+            with app.app_context():
+                changed = transition_appointments(appointment_ids, status)
                 db.session.commit()
-                flash('Appointment declined successfully!', 'success')
-    except Exception as e:
-        db.session.rollback()
-        flash(f'Error declining appointment: {str(e)}', 'error')
+            skipped = len(appointment_ids) - changed
+            flash(f'{changed} appointment(s) {status}.' + (
+                f' {skipped} skipped because they were no longer pending.' if skipped else ''),
+                'success' if changed else 'error')
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Error updating appointments: {str(e)}', 'error')
     return redirect(url_for('appointments'))
 
 
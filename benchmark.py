@@ -0,0 +1,868 @@
+"""
+Benchmarks for the Flask routes.
+
+Runs against a throwaway local SQLite database, so no MySQL server or
+network access is needed; set BENCHMARK_DATABASE_URL to use a local MySQL
+container instead. Each benchmark seeds the tables at several sizes and
+drives the routes through the Flask test client.
+
+Usage:
+    python benchmark.py routes
+    python benchmark.py routes --sizes 2000 --save-baseline
+    python benchmark.py appointments
+    python benchmark.py appointments --sizes 10000 100000 1000000
+    python benchmark.py caregivers --sizes 2000 10000
+    python benchmark.py search --sizes 10000 100000
+    python benchmark.py overlap --sizes 10000 100000 1000000
+    python benchmark.py matches --sizes 10000 100000
+    python benchmark.py deletes --sizes 1000 10000
+    python benchmark.py signups --sizes 10000
+    python benchmark.py imports --sizes 50000
+    python benchmark.py sql --sizes 1 200
+    python benchmark.py pool --sizes 1 2 4 8 16
+"""
+import argparse
+import csv
+import os
+import random
+import statistics
+import subprocess
+import sys
+import json
+import re
+import tempfile
+import threading
+import time as timer
+import tracemalloc
+from datetime import date, datetime, time, timedelta
+
+# Point the app at a local SQLite file before it is imported
+DB_FILE = os.path.join(tempfile.mkdtemp(), 'benchmark.db')
+os.environ['DATABASE_URL'] = os.getenv('BENCHMARK_DATABASE_URL', f'sqlite:///{DB_FILE}')
+
+from sqlalchemy import event, func, insert, select, text  # noqa: E402
+from sqlalchemy.orm import joinedload  # noqa: E402
+
+from app import (app, encode_cursor, keyset_paginate, caregiver_activity_summary, check_appointment_overlap,  # noqa: E402
+                 match_index, town_key, purge, apply_user_search, rebuild_users_search, pool_metrics, facet_cache,
+                 parse_signup, import_signups, read_import_records)
+from script import seed_database, split_sql_statements  # noqa: E402
+from models import db, rebuild_table_stats, rebuild_caregiver_earnings, rebuild_job_application_listing, Users, Caregiver, Member, Address, Job, JobApplication, Appointment, APPOINTMENT_STATUSES  # noqa: E402
+
+BATCH_SIZE = 10000
+GIVEN_NAMES = ['Arman', 'Amina', 'Bota', 'Daniyar', 'Saltanat', 'Ivan', 'Aliya', 'John', 'Mary', 'Timur']
+SURNAMES = ['Armanov', 'Aminova', 'Baimen', 'Duisen', 'Serik', 'Ivanov', 'Akhmet', 'Doe', 'Jane', 'Tolegen']
+PEOPLE = 200
+REPEAT = 20
+CLIENTS = 16
+REQUESTS_PER_CLIENT = 50
+# Appointments accepted per request in the bulk accept route case
+BULK_STATUS_SIZE = 10
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+# A route regresses when it issues more statements than the baseline, or its
+# p95 latency or peak memory grows past these margins
+LATENCY_TOLERANCE = 1.5
+LATENCY_SLACK_MS = 10
+MEMORY_TOLERANCE = 1.5
+MEMORY_SLACK_KIB = 256
+# Added to every statement in the pool benchmark to stand in for the round
+# trip to a remote MySQL server, which is what keeps a connection busy
+ROUND_TRIP_MS = 5
+
+
+def reset_database():
+    """Drop and recreate every table"""
+    db.drop_all()
+    db.create_all()
+
+
+def seed_people(count: int = PEOPLE):
+    """Insert users that are both caregivers and members"""
+    db.session.execute(insert(Users), [
+        {'user_id': i, 'email': f'user{i}@example.com', 'given_name': f'Given{i}',
+         'surname': f'Surname{i}', 'city': 'Astana', 'phone_number': f'+7700{i:07d}',
+         'password': 'Passw0rd!'}
+        for i in range(1, count + 1)])
+    db.session.execute(insert(Caregiver), [
+        {'caregiver_user_id': i, 'caregiving_type': 'babysitter', 'hourly_rate': 10}
+        for i in range(1, count + 1)])
+    db.session.execute(insert(Member), [
+        {'member_user_id': i} for i in range(1, count + 1)])
+    db.session.commit()
+
+
+def seed_appointments(total: int, people: int = PEOPLE):
+    """Insert appointments in batches spread over roughly three years"""
+    rng = random.Random(42)
+    start = date(2025, 1, 1)
+    for offset in range(0, total, BATCH_SIZE):
+        db.session.execute(insert(Appointment), [
+            {'appointment_id': i,
+             'caregiver_user_id': rng.randint(1, people),
+             'member_user_id': rng.randint(1, people),
+             'appointment_date': start + timedelta(days=rng.randint(0, 1095)),
+             'appointment_time': time(rng.randint(0, 23), rng.choice([0, 30])),
+             'work_hours': rng.randint(1, 16) / 2,
+             'status': rng.choice(APPOINTMENT_STATUSES)}
+            for i in range(offset + 1, min(offset + BATCH_SIZE, total) + 1)])
+        db.session.commit()
+
+
+def seed_named_users(total: int):
+    """Insert users with realistic names, emails and phone numbers"""
+    rng = random.Random(11)
+    for offset in range(0, total, BATCH_SIZE):
+        rows = []
+        for i in range(offset + 1, min(offset + BATCH_SIZE, total) + 1):
+            given, surname = rng.choice(GIVEN_NAMES), rng.choice(SURNAMES)
+            rows.append({'user_id': i, 'email': f'{given}.{surname}{i}@example.com'.lower(),
+                         'given_name': given, 'surname': surname, 'city': 'Astana',
+                         'phone_number': f'+7 {rng.randint(700, 778)} {i:07d}', 'password': 'Passw0rd!'})
+        db.session.execute(insert(Users), rows)
+        db.session.commit()
+
+
+def seed_job_applications(total: int, people: int = PEOPLE):
+    """Insert one job per member and spread applications over caregiver/job pairs"""
+    db.session.execute(insert(Job), [
+        {'job_id': i, 'member_user_id': i, 'required_caregiving_type': 'babysitter',
+         'date_posted': date(2025, 1, 1)}
+        for i in range(1, people + 1)])
+    pairs = [(c, j) for c in range(1, people + 1) for j in range(1, people + 1)]
+    rng = random.Random(7)
+    rng.shuffle(pairs)
+    for offset in range(0, min(total, len(pairs)), BATCH_SIZE):
+        db.session.execute(insert(JobApplication), [
+            {'caregiver_user_id': c, 'job_id': j,
+             'date_applied': date(2025, 1, 1) + timedelta(days=rng.randint(0, 365))}
+            for c, j in pairs[offset:min(offset + BATCH_SIZE, total)]])
+        db.session.commit()
+
+
+def timed(function, repeat: int = REPEAT) -> dict:
+    """Call a function repeatedly and return latency percentiles in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        started = timer.perf_counter()
+        function()
+        samples.append((timer.perf_counter() - started) * 1000)
+    samples.sort()
+    return {'p50': statistics.median(samples),
+            'p95': samples[int(len(samples) * 0.95) - 1]}
+
+
+def measure(client, url: str, repeat: int = REPEAT) -> dict:
+    """Request a URL repeatedly and return latency percentiles in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        started = timer.perf_counter()
+        response = client.get(url)
+        samples.append((timer.perf_counter() - started) * 1000)
+        assert response.status_code == 200, f'{url} returned {response.status_code}'
+    samples.sort()
+    return {'p50': statistics.median(samples),
+            'p95': samples[int(len(samples) * 0.95) - 1]}
+
+
+def measure_page_query(url: str, repeat: int = REPEAT) -> dict:
+    """Time only the keyset page fetch for a URL, without the rest of the route"""
+    def fetch_page():
+        with app.test_request_context(url):
+            keyset_paginate(Appointment.query, [
+                Appointment.appointment_date, Appointment.appointment_id], descending=True)
+            db.session.remove()
+    return timed(fetch_page, repeat)
+
+
+def bench_appointments(sizes: list[int] = (10000, 100000, 1000000)):
+    """Per-page latency of /appointments at the first, middle and last page"""
+    print(f"{'rows':>10} {'page':>8} {'route p50':>10} {'route p95':>10} {'query p50':>10} {'query p95':>10}")
+    for size in sizes:
+        with app.app_context():
+            reset_database()
+            seed_people()
+            seed_appointments(size)
+            # Cursors pointing into the middle and the end of the sort order
+            ordered = db.session.query(Appointment.appointment_date, Appointment.appointment_id).order_by(
+                Appointment.appointment_date.desc(), Appointment.appointment_id.desc())
+            middle = ordered.offset(size // 2).first()
+            last = ordered.offset(max(size - 60, 0)).first()
+        client = app.test_client()
+        pages = {
+            'first': '/appointments',
+            'middle': f'/appointments?after={encode_cursor(middle)}',
+            'last': f'/appointments?after={encode_cursor(last)}',
+        }
+        for name, url in pages.items():
+            route = measure(client, url)
+            query = measure_page_query(url)
+            print(f"{size:>10} {name:>8} {route['p50']:>10.2f} {route['p95']:>10.2f} "
+                  f"{query['p50']:>10.2f} {query['p95']:>10.2f}")
+
+
+def bench_caregivers(sizes: list[int] = (2000, 10000)):
+    """Rows fetched and wall time of the /caregivers data load, before and after"""
+    print(f"{'appts':>10} {'variant':>8} {'rows':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    for size in sizes:
+        with app.app_context():
+            reset_database()
+            seed_people()
+            seed_appointments(size)
+            seed_job_applications(size // 2)
+
+            # Before: every caregiver with both collections joined in
+            def before():
+                Caregiver.query.options(
+                    joinedload(Caregiver.user),
+                    joinedload(Caregiver.appointments),
+                    joinedload(Caregiver.job_applications)
+                ).order_by(Caregiver.caregiver_user_id).all()
+
+            before_rows = db.session.execute(text(
+                "SELECT COUNT(*) FROM caregiver c "
+                "JOIN users u ON u.user_id = c.caregiver_user_id "
+                "LEFT JOIN appointment a ON a.caregiver_user_id = c.caregiver_user_id "
+                "LEFT JOIN job_application ja ON ja.caregiver_user_id = c.caregiver_user_id"
+            )).scalar()
+            before_time = timed(before, repeat=3)
+
+        # After: one page of caregivers plus one grouped summary query
+        def after():
+            with app.test_request_context('/caregivers'):
+                page = keyset_paginate(Caregiver.query.options(joinedload(Caregiver.user)),
+                                       [Caregiver.caregiver_user_id])
+                after.rows = len(page['items']) + len(caregiver_activity_summary(
+                    [c.caregiver_user_id for c in page['items']]))
+                db.session.remove()
+
+        after_time = timed(after)
+
+        print(f"{size:>10} {'before':>8} {before_rows:>10} "
+              f"{before_time['p50']:>10.2f} {before_time['p95']:>10.2f}")
+        print(f"{size:>10} {'after':>8} {after.rows:>10} "
+              f"{after_time['p50']:>10.2f} {after_time['p95']:>10.2f}")
+
+
+def bench_search(sizes: list[int] = (10000, 100000)):
+    """Latency of the /users search: LIKE '%term%' scan versus the FTS5 index"""
+    print(f"{'users':>10} {'term':>20} {'backend':>8} {'matches':>8} {'p50 ms':>10} {'p95 ms':>10}")
+    for size in sizes:
+        with app.app_context():
+            reset_database()
+            seed_named_users(size)
+            with db.engine.begin() as connection:
+                rebuild_users_search(connection)
+            # Common prefixes, a multi-word name, a single user's email and no match at all
+            rare = db.session.get(Users, size // 2).email.split('@')[0]
+            terms = ['arm', 'aminova', 'daniyar duisen', rare, 'zhanar']
+            for term in terms:
+                for backend in ('like', 'fts5'):
+                    def search():
+                        query, _ = apply_user_search(Users.query, term, backend)
+                        search.matches = len(query.limit(50).all())
+                    result = timed(search)
+                    print(f"{size:>10} {term:>20} {backend:>8} {search.matches:>8} "
+                          f"{result['p50']:>10.2f} {result['p95']:>10.2f}")
+
+
+def bench_overlap(sizes: list[int] = (10000, 100000, 1000000)):
+    """Double-booking check: scanning the caregiver's appointments versus the span index probe"""
+    print(f"{'appts':>10} {'variant':>8} {'conflicts':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    repeat = 200
+    for size in sizes:
+        with app.app_context():
+            reset_database()
+            seed_people()
+            seed_appointments(size)
+
+            rng = random.Random(5)
+            slots = [(rng.randint(1, PEOPLE), date(2025, 1, 1) + timedelta(days=rng.randint(0, 1095)),
+                      time(rng.randint(0, 23), rng.choice([0, 30])), rng.randint(1, 16) / 2)
+                     for _ in range(repeat)]
+
+            # Before: load every active appointment of the caregiver and compare in Python
+            def scan(caregiver_id, appointment_date, appointment_time, work_hours):
+                starts_at = datetime.combine(appointment_date, appointment_time)
+                ends_at = starts_at + timedelta(hours=work_hours)
+                for other in Appointment.query.filter(
+                        Appointment.caregiver_user_id == caregiver_id,
+                        Appointment.status.in_(('pending', 'accepted'))):
+                    other_start = datetime.combine(other.appointment_date, other.appointment_time)
+                    if other_start < ends_at and other_start + timedelta(hours=float(other.work_hours)) > starts_at:
+                        return False
+                return True
+
+            # After: one bounded range probe on idx_appointment_caregiver_span
+            def probe(*slot):
+                return check_appointment_overlap(*slot)[0]
+
+            results = {}
+            for name, check in (('scan', scan), ('probe', probe)):
+                pending = iter(slots)
+                outcomes = []
+                latency = timed(lambda: outcomes.append(check(*next(pending))), repeat=repeat)
+                results[name] = outcomes
+                print(f"{size:>10} {name:>8} {outcomes.count(False):>10} "
+                      f"{latency['p50']:>10.3f} {latency['p95']:>10.3f}")
+            assert results['scan'] == results['probe'], 'probe and scan disagree'
+
+
+def bench_deletes(sizes: list[int] = (1000, 10000)):
+    """Deleting a member with a long history: loading every child row, the database cascade, and a chunked purge"""
+    print(f"{'history':>10} {'variant':>8} {'ms':>10} {'statements':>11}")
+    for size in sizes:
+        for name in ('orm', 'cascade', 'purge'):
+            with app.app_context():
+                reset_database()
+                seed_people()
+                # Member 1 has every appointment, plus a tenth as many jobs with one application each
+                jobs = size // 10
+                db.session.execute(insert(Appointment), [
+                    {'appointment_id': i, 'caregiver_user_id': 2 + i % (PEOPLE - 1), 'member_user_id': 1,
+                     'appointment_date': date(2025, 1, 1) + timedelta(days=i % 1095), 'appointment_time': time(9, 0),
+                     'work_hours': 2, 'status': APPOINTMENT_STATUSES[i % 3]} for i in range(1, size + 1)])
+                db.session.execute(insert(Job), [
+                    {'job_id': j, 'member_user_id': 1, 'required_caregiving_type': 'babysitter',
+                     'date_posted': date(2025, 1, 1)} for j in range(1, jobs + 1)])
+                db.session.execute(insert(JobApplication), [
+                    {'caregiver_user_id': 2 + j % (PEOPLE - 1), 'job_id': j, 'date_applied': date(2025, 1, 2)}
+                    for j in range(1, jobs + 1)])
+                db.session.commit()
+                with db.engine.begin() as connection:
+                    rebuild_table_stats(connection)
+                    rebuild_caregiver_earnings(connection)
+                    rebuild_job_application_listing(connection)
+
+                statements = []
+
+                @event.listens_for(db.engine, 'before_cursor_execute')
+                def count(conn, cursor, statement, parameters, context, executemany):
+                    statements.append(statement)
+
+                started = timer.perf_counter()
+                member = db.session.get(Member, 1)
+                if name == 'orm':
+                    # Before: every child row is loaded and deleted through the session
+                    for job in member.jobs:
+                        job.applications
+                    member.appointments
+                    member.address
+                    db.session.delete(member)
+                    db.session.commit()
+                elif name == 'cascade':
+                    db.session.delete(member)
+                    db.session.commit()
+                else:
+                    purge(Member, 1)
+                elapsed = (timer.perf_counter() - started) * 1000
+                event.remove(db.engine, 'before_cursor_execute', count)
+                assert db.session.get(Member, 1) is None
+                assert not db.session.scalar(select(func.count()).select_from(Appointment).where(
+                    Appointment.member_user_id == 1))
+                print(f"{size + 2 * jobs:>10} {name:>8} {elapsed:>10.1f} {len(statements):>11}")
+
+
+def signup_payload(i: int) -> dict:
+    """A /api/signups entry: every other signup is a caregiver and every third a member"""
+    data = {'email': f'signup{i}@example.com', 'given_name': GIVEN_NAMES[i % 10], 'surname': SURNAMES[i % 10],
+            'city': 'Astana', 'phone_number': f'+7705{i:07d}', 'password': 'Passw0rd!'}
+    if i % 2:
+        data['caregiver'] = {'caregiving_type': 'babysitter', 'hourly_rate': 10 + i % 20}
+    if i % 3 == 0:
+        data['member'] = {'house_number': str(i % 200), 'street': 'Abay', 'town': 'Astana'}
+    return data
+
+
+def bench_signups(sizes: list[int] = (10000,)):
+    """Signup throughput: one unit of work per signup, as the create forms do, against the batched /api/signups"""
+    print(f"{'signups':>10} {'variant':>8} {'seconds':>10} {'per sec':>10} {'statements':>11}")
+    client = app.test_client()
+    for size in sizes:
+        payload = [signup_payload(i) for i in range(size)]
+        for name in ('orm', 'api'):
+            with app.app_context():
+                reset_database()
+                seed_people()
+                with db.engine.begin() as connection:
+                    rebuild_table_stats(connection)
+                    rebuild_caregiver_earnings(connection)
+                    rebuild_users_search(connection)
+
+                statements = []
+
+                @event.listens_for(db.engine, 'before_cursor_execute')
+                def count(conn, cursor, statement, parameters, context, executemany):
+                    statements.append(statement)
+
+                started = timer.perf_counter()
+                if name == 'orm':
+                    for data in payload:
+                        signup, _ = parse_signup(data)
+                        user = Users(**signup.user)
+                        if signup.caregiver:
+                            user.caregiver = Caregiver(**signup.caregiver)
+                        if signup.member:
+                            user.member = Member(**signup.member, address=Address(**signup.address))
+                        db.session.add(user)
+                        db.session.commit()
+                else:
+                    response = client.post('/api/signups', json=payload)
+                    assert response.status_code == 201, response.get_json()
+                elapsed = timer.perf_counter() - started
+                event.remove(db.engine, 'before_cursor_execute', count)
+                assert db.session.scalar(select(func.count()).select_from(Users)) == PEOPLE + size
+                print(f"{size:>10} {name:>8} {elapsed:>10.2f} {size / elapsed:>10.0f} {len(statements):>11}")
+
+
+def bench_imports(sizes: list[int] = (50000,)):
+    """Bulk import throughput from a CSV file, with a few invalid and duplicate rows mixed in"""
+    print(f"{'rows':>10} {'seconds':>10} {'rows/min':>10} {'rejected':>10} {'statements':>11}")
+    columns = ['email', 'given_name', 'surname', 'city', 'phone_number', 'password',
+               'caregiving_type', 'hourly_rate', 'house_number', 'street', 'town']
+    for size in sizes:
+        path = os.path.join(os.path.dirname(DB_FILE), f'import-{size}.csv')
+        with open(path, 'w', newline='') as stream:
+            writer = csv.writer(stream)
+            writer.writerow(columns)
+            for i in range(size):
+                data = signup_payload(i)
+                # One row in a thousand repeats an earlier email, one has a short password
+                if i % 1000 == 999:
+                    data['email'] = signup_payload(i - 2)['email']
+                elif i % 1000 == 998:
+                    data['password'] = 'short'
+                caregiver, member = data.get('caregiver', {}), data.get('member', {})
+                writer.writerow([data['email'], data['given_name'], data['surname'], data['city'],
+                                 data['phone_number'], data['password'], caregiver.get('caregiving_type', ''),
+                                 caregiver.get('hourly_rate', ''), member.get('house_number', ''),
+                                 member.get('street', ''), member.get('town', '')])
+
+        with app.app_context():
+            reset_database()
+            seed_people()
+            with db.engine.begin() as connection:
+                rebuild_table_stats(connection)
+                rebuild_caregiver_earnings(connection)
+                rebuild_users_search(connection)
+
+            statements = []
+
+            @event.listens_for(db.engine, 'before_cursor_execute')
+            def count(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            started = timer.perf_counter()
+            with open(path, newline='') as stream:
+                report = import_signups(read_import_records(stream, 'csv'))
+            elapsed = timer.perf_counter() - started
+            event.remove(db.engine, 'before_cursor_execute', count)
+            assert report.imported + len(report.errors) == size
+            assert db.session.scalar(select(func.count()).select_from(Users)) == PEOPLE + report.imported
+            print(f"{size:>10} {elapsed:>10.2f} {size / elapsed * 60:>10.0f} "
+                  f"{len(report.errors):>10} {len(statements):>11}")
+
+
+# Scripts and the statements script.py must split them into
+SQL_SPLIT_CASES = [
+    ("SELECT 1;;SELECT 2", ['SELECT 1', 'SELECT 2']),
+    ("SELECT 1; ; SELECT 2;", ['SELECT 1', 'SELECT 2']),
+    ("SELECT 1;\n-- c\n;\nSELECT 2", ['SELECT 1', 'SELECT 2']),
+    ("INSERT INTO t VALUES ('a;b', 'it''s; ok');", ["INSERT INTO t VALUES ('a;b', 'it''s; ok')"]),
+    ("SELECT /* a; b */ 1; -- trailing; comment", ['SELECT /* a; b */ 1']),
+    ("/*!40101 SET NAMES utf8 */;", ['/*!40101 SET NAMES utf8 */']),
+    ("DELIMITER $$\nCREATE PROCEDURE p() BEGIN SELECT 1; END$$\nDELIMITER ;\nSELECT 2;",
+     ['CREATE PROCEDURE p() BEGIN SELECT 1; END', 'SELECT 2']),
+    ("COPY t (a) FROM stdin;\n1;2\n\\.\nSELECT 3;", ['COPY t (a) FROM stdin', 'SELECT 3']),
+]
+# The same scripts lexed by each dialect's rules
+SQL_DIALECT_CASES = [
+    ("SELECT 5 # 3;\nSELECT 1;", 'mysql', ['SELECT 5 # 3;\nSELECT 1']),
+    ("SELECT 5 # 3;\nSELECT 1;", 'postgresql', ['SELECT 5 # 3', 'SELECT 1']),
+    ("SELECT 'a\\'; SELECT 1;", 'mysql', ["SELECT 'a\\'; SELECT 1;"]),
+    ("SELECT 'a\\'; SELECT 1;", 'sqlite', ["SELECT 'a\\'", 'SELECT 1']),
+    ("SELECT E'a\\'; b'; SELECT 1;", 'postgresql', ["SELECT E'a\\'; b'", 'SELECT 1']),
+    ("SELECT [a;b] FROM t; SELECT 1;", 'sqlite', ['SELECT [a;b] FROM t', 'SELECT 1']),
+    ("CREATE FUNCTION f() RETURNS int AS $body$ SELECT 1; $body$ LANGUAGE sql; SELECT $1;", 'postgresql',
+     ['CREATE FUNCTION f() RETURNS int AS $body$ SELECT 1; $body$ LANGUAGE sql', 'SELECT $1']),
+    ("SELECT 1 --1;\nSELECT 2;", 'mysql', ['SELECT 1 --1', 'SELECT 2']),
+    ("SELECT 1 --1;\nSELECT 2;", 'postgresql', ['SELECT 1 --1;\nSELECT 2']),
+]
+
+
+def bench_sql(sizes: list[int] = (1, 200)):
+    """Splitting SQL scripts: the edge cases, then db/db.sql repeated size times"""
+    for sql, expected in SQL_SPLIT_CASES:
+        statements = split_sql_statements(sql)
+        assert statements == expected, f'{sql!r} split into {statements}'
+    for sql, dialect, expected in SQL_DIALECT_CASES:
+        statements = split_sql_statements(sql, dialect)
+        assert statements == expected, f'{sql!r} split into {statements} by {dialect} rules'
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'db', 'db.sql'), encoding='utf-8') as dump:
+        sql = dump.read()
+    print(f"{'copies':>10} {'statements':>11} {'ms':>10}")
+    for size in sizes:
+        script = sql * size
+        started = timer.perf_counter()
+        statements = split_sql_statements(script, 'postgresql')
+        elapsed = (timer.perf_counter() - started) * 1000
+        assert all(statements), 'empty statement'
+        print(f"{size:>10} {len(statements):>11} {elapsed:>10.1f}")
+
+
+def bench_matches(sizes: list[int] = (10000, 100000)):
+    """Job matching from the in-memory index: build, refresh, ranking and the /jobs/<id>/matches route"""
+    print(f"{'caregivers':>10} {'step':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    for size in sizes:
+        with app.app_context():
+            reset_database()
+            # script.py seed makes 4 of every 10 users caregivers
+            with db.engine.connect() as connection:
+                seed_database(connection, users=size * 10 // 4, appointments=size * 2,
+                              seed_value=1, batch_size=BATCH_SIZE, reset=False)
+            jobs = db.session.query(Job.job_id, Job.required_caregiving_type, Address.town).outerjoin(
+                Address, Address.member_user_id == Job.member_user_id).order_by(Job.job_id).limit(REPEAT).all()
+            caregivers = db.session.scalars(db.select(Caregiver).limit(REPEAT)).all()
+
+            match_index.clear()
+            build = timed(lambda: (match_index.clear(), match_index.ensure_current(db.session)), repeat=3)
+
+            # The index must rank exactly like sorting every caregiver of the type
+            profiles = match_index.load(db.session)
+            for job_id, caregiving_type, town in jobs[:5]:
+                expected = sorted((profile for profile in profiles if profile.caregiving_type == caregiving_type),
+                                  key=lambda profile: (town_key(profile.city) != town_key(town), profile.rank_key))
+                ranked = [profile for profile, _ in match_index.rank(caregiving_type, town, 20)]
+                assert ranked == expected[:20], f'index ranking differs for job {job_id}'
+
+            pending = iter(jobs)
+            rank = timed(lambda: match_index.rank(*next(pending)[1:], 20), repeat=len(jobs))
+
+            # One caregiver's rate changes, then the next lookup reloads only that row
+            changed = iter(caregivers)
+
+            def refresh():
+                caregiver = next(changed)
+                caregiver.hourly_rate = caregiver.hourly_rate + 1
+                db.session.commit()
+                started = timer.perf_counter()
+                match_index.ensure_current(db.session)
+                refresh.elapsed.append((timer.perf_counter() - started) * 1000)
+            refresh.elapsed = []
+            for _ in caregivers:
+                refresh()
+            refresh.elapsed.sort()
+
+        client = app.test_client()
+        route_urls = iter(f'/jobs/{job_id}/matches' for job_id, _, _ in jobs)
+        route = timed(lambda: client.get(next(route_urls)), repeat=len(jobs))
+
+        for step, result in (('build', build), ('rank', rank), ('route', route)):
+            print(f"{size:>10} {step:>10} {result['p50']:>10.3f} {result['p95']:>10.3f}")
+        print(f"{size:>10} {'refresh':>10} {statistics.median(refresh.elapsed):>10.3f} "
+              f"{refresh.elapsed[int(len(refresh.elapsed) * 0.95) - 1]:>10.3f}")
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of a sorted list"""
+    return samples[max(int(len(samples) * fraction + 0.5) - 1, 0)]
+
+
+def run_pool_load():
+    """Hit a database-bound JSON route from concurrent clients and print one result row"""
+    with app.app_context():
+        reset_database()
+        seed_people()
+        seed_appointments(2000)
+
+        @event.listens_for(db.engine, 'before_cursor_execute')
+        def simulate_round_trip(*args):
+            timer.sleep(ROUND_TRIP_MS / 1000)
+
+    samples, lock = [], threading.Lock()
+
+    def client_loop():
+        client = app.test_client()
+        rng = random.Random(threading.get_ident())
+        for _ in range(REQUESTS_PER_CLIENT):
+            url = f'/caregivers/{rng.randint(1, PEOPLE)}/details'
+            started = timer.perf_counter()
+            response = client.get(url)
+            elapsed = (timer.perf_counter() - started) * 1000
+            assert response.status_code == 200, f'{url} returned {response.status_code}'
+            with lock:
+                samples.append(elapsed)
+
+    before = pool_metrics['primary'].snapshot()
+    threads = [threading.Thread(target=client_loop) for _ in range(CLIENTS)]
+    started = timer.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = timer.perf_counter() - started
+    stats = pool_metrics['primary'].snapshot()
+    checkouts = stats['checkouts'] - before['checkouts']
+    wait_ms = (stats['wait_sum'] - before['wait_sum']) * 1000
+
+    samples.sort()
+    print(f"{os.environ['DB_POOL_SIZE']:>6} {CLIENTS:>8} {len(samples) / wall:>8.1f} "
+          f"{percentile(samples, 0.5):>9.1f} {percentile(samples, 0.95):>9.1f} {percentile(samples, 0.99):>9.1f} "
+          f"{wait_ms / max(checkouts, 1):>10.2f} {stats['wait_max'] * 1000:>10.1f} {stats['timeouts']:>9}",
+          flush=True)
+
+
+def bench_pool(sizes: list[int] = (1, 2, 4, 8, 16)):
+    """Request latency under concurrent load for each connection pool size"""
+    if os.getenv('BENCHMARK_POOL_WORKER'):
+        return run_pool_load()
+    print(f"{'pool':>6} {'clients':>8} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'wait avg':>10} {'wait max':>10} {'timeouts':>9}", flush=True)
+    # The pool is built when the app is imported, so each size runs in its own process
+    for size in sizes:
+        subprocess.run([sys.executable, __file__, 'pool'], check=True, env={
+            **os.environ, 'BENCHMARK_POOL_WORKER': '1',
+            'DB_POOL_SIZE': str(size), 'DB_MAX_OVERFLOW': '0', 'DB_POOL_TIMEOUT': '30'})
+
+
+def route_cases(ids: dict) -> dict:
+    """
+    Requests for every list and CRUD route, keyed by name. Each case maps an
+    iteration number to (method, url, form data); POST cases use a fresh
+    record per iteration so that every request succeeds.
+    """
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    caregiver, member, job, appointment = ids['caregiver'], ids['member'], ids['job'], ids['appointment']
+    spares = len(ids['spare_users'])
+
+    def person(i: int, prefix: str, area_code: int) -> dict:
+        return {'email': f'{prefix}{i}@bench.example.com', 'given_name': 'Bench', 'surname': f'User{i}',
+                'city': 'Astana', 'phone_number': f'+7 ({area_code}) 555-{i:04d}', 'password': 'Passw0rd!'}
+
+    def get(url: str):
+        return lambda i: ('GET', url, None)
+
+    return {
+        'home': get('/'),
+        'users': get('/users'),
+        'users_search': get('/users?search=arm'),
+        'caregivers': get('/caregivers'),
+        'caregiver_details': get(f'/caregivers/{caregiver}/details'),
+        'members': get('/members'),
+        'addresses': get('/addresses'),
+        'jobs': get('/jobs'),
+        'job_matches': get(f'/jobs/{job}/matches'),
+        'job_applications': get('/job-applications'),
+        'appointments': get('/appointments'),
+        'appointments_filtered': get('/appointments?status=pending&min_hours=2'),
+        'suggest_members': get('/api/suggest/members?q=ar'),
+        'create_user_form': get('/users/create'),
+        'create_caregiver_form': get('/caregivers/create'),
+        'create_member_form': get('/members/create'),
+        'create_job_form': get('/jobs/create'),
+        'create_job_application_form': get('/job-applications/create'),
+        'create_appointment_form': get('/appointments/create'),
+        'edit_user_form': get(f'/users/{caregiver}/edit'),
+        'edit_caregiver_form': get(f'/caregivers/{caregiver}/edit'),
+        'edit_member_form': get(f'/members/{member}/edit'),
+        'edit_address_form': get(f'/addresses/{member}/edit'),
+        'edit_job_form': get(f'/jobs/{job}/edit'),
+        'edit_appointment_form': get(f'/appointments/{appointment}/edit'),
+        'create_user': lambda i: ('POST', '/users/create', person(i, 'user', 701)),
+        'create_caregiver': lambda i: ('POST', '/caregivers/create', {
+            **person(i, 'caregiver', 702), 'caregiving_type': 'babysitter', 'hourly_rate': '12.50', 'gender': 'Female'}),
+        'create_member': lambda i: ('POST', '/members/create', {
+            **person(i, 'member', 703), 'house_number': '5', 'street': 'Abai', 'town': 'Astana'}),
+        'edit_user': lambda i: ('POST', f'/users/{ids["spare_users"][i]}/edit', {
+            **person(i, 'spare', 704), 'given_name': 'Edited'}),
+        'delete_user': lambda i: ('POST', f'/users/{ids["spare_users"][i]}/delete', None),
+        'create_job': lambda i: ('POST', '/jobs/create', {
+            'member_user_id': member, 'required_caregiving_type': 'babysitter', 'date_posted': tomorrow}),
+        'edit_job': lambda i: ('POST', f'/jobs/{job}/edit', {
+            'required_caregiving_type': 'babysitter', 'date_posted': '2025-01-10', 'other_requirements': f'Run {i}'}),
+        'create_job_application': lambda i: ('POST', '/job-applications/create', {
+            'caregiver_user_id': caregiver, 'job_id': ids['spare_jobs'][i], 'date_applied': tomorrow}),
+        'delete_job_application': lambda i: ('POST', f'/job-applications/{caregiver}/{ids["spare_jobs"][i]}/delete', None),
+        'delete_job': lambda i: ('POST', f'/jobs/{ids["spare_jobs"][i]}/delete', None),
+        # A day per request so the new appointments never overlap each other
+        'create_appointment': lambda i: ('POST', '/appointments/create', {
+            'caregiver_user_id': caregiver, 'member_user_id': member,
+            'appointment_date': (date.today() + timedelta(days=2 + i)).isoformat(),
+            'appointment_time': '10:00', 'work_hours': '3'}),
+        'edit_appointment': lambda i: ('POST', f'/appointments/{appointment}/edit', {
+            'appointment_date': tomorrow, 'appointment_time': f'{8 + i % 10:02d}:00', 'work_hours': '4',
+            'status': 'pending'}),
+        'accept_appointment': lambda i: ('POST', f'/appointments/{ids["pending_appointments"][i]}/accept', None),
+        'decline_appointment': lambda i: ('POST', f'/appointments/{ids["pending_appointments"][spares + i]}/decline', None),
+        'delete_appointment': lambda i: ('POST', f'/appointments/{ids["pending_appointments"][2 * spares + i]}/delete', None),
+        'bulk_accept_appointments': lambda i: ('POST', '/appointments/bulk-status', {
+            'status': 'accepted', 'appointment_ids': ids['pending_appointments'][
+                3 * spares + BULK_STATUS_SIZE * i:3 * spares + BULK_STATUS_SIZE * (i + 1)]}),
+    }
+
+
+def seed_route_dataset(users: int, spares: int) -> dict:
+    """Seed a generated dataset plus spare rows for the edit and delete cases - returns the IDs to use"""
+    reset_database()
+    facet_cache.clear()
+    with db.engine.connect() as connection:
+        seed_database(connection, users, 2 * users, seed_value=42, batch_size=BATCH_SIZE, reset=False)
+    with db.engine.begin() as connection:
+        rebuild_users_search(connection)
+
+    caregiver = db.session.execute(text(
+        "SELECT MIN(c.caregiver_user_id) FROM caregiver c JOIN member m ON m.member_user_id = c.caregiver_user_id"
+    )).scalar()
+    max_user = db.session.execute(text("SELECT MAX(user_id) FROM users")).scalar()
+    max_job = db.session.execute(text("SELECT MAX(job_id) FROM job")).scalar()
+    max_appointment = db.session.execute(text("SELECT MAX(appointment_id) FROM appointment")).scalar()
+    spare_users = list(range(max_user + 1, max_user + spares + 1))
+    spare_jobs = list(range(max_job + 1, max_job + spares + 1))
+    # Pending appointments for the accept, decline, delete and bulk accept cases
+    pending_appointments = list(range(max_appointment + 1, max_appointment + (3 + BULK_STATUS_SIZE) * spares + 1))
+    db.session.execute(insert(Users), [
+        {'user_id': u, 'email': f'spare{u}@bench.example.com', 'given_name': 'Spare', 'surname': f'User{u}',
+         'city': 'Astana', 'phone_number': f'+7 (798) {u:07d}', 'password': 'Passw0rd!'} for u in spare_users])
+    db.session.execute(insert(Job), [
+        {'job_id': j, 'member_user_id': caregiver, 'required_caregiving_type': 'babysitter',
+         'date_posted': date(2025, 1, 1)} for j in spare_jobs])
+    db.session.execute(insert(Appointment), [
+        {'appointment_id': a, 'caregiver_user_id': caregiver, 'member_user_id': caregiver,
+         'appointment_date': date(2025, 1, 1), 'appointment_time': time(9, 0), 'work_hours': 2,
+         'status': 'pending'} for a in pending_appointments])
+    db.session.commit()
+    return {
+        'caregiver': caregiver,
+        'member': caregiver,
+        'job': db.session.execute(text("SELECT MIN(job_id) FROM job")).scalar(),
+        'appointment': db.session.execute(text("SELECT MIN(appointment_id) FROM appointment")).scalar(),
+        'spare_users': spare_users,
+        'spare_jobs': spare_jobs,
+        'pending_appointments': pending_appointments,
+    }
+
+
+def send(client, method: str, url: str, data: dict | None):
+    """Send one request and fail on an error status or an error flash message"""
+    response = client.open(url, method=method, data=data)
+    assert response.status_code in (200, 302), f'{method} {url} returned {response.status_code}'
+    with client.session_transaction() as session:
+        errors = [message for category, message in session.pop('_flashes', []) if category == 'error']
+    assert not errors, f'{method} {url} failed: {errors[0]}'
+    # Forms that fail validation render their error flash instead of redirecting
+    assert b'flash-message flash-error' not in response.data, f'{method} {url} rendered an error message'
+    return response
+
+
+def statement_count(response) -> int:
+    """SQL statements issued by the request, from its Server-Timing header"""
+    found = re.search(r'desc="(\d+) queries"', ', '.join(response.headers.getlist('Server-Timing')))
+    return int(found.group(1)) if found else 0
+
+
+def measure_route(client, case, repeat: int) -> dict:
+    """Latency percentiles, statement count and peak memory of one route case"""
+    # The first request warms the caches, the second is traced for memory
+    send(client, *case(0))
+    tracemalloc.start()
+    response = send(client, *case(1))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    statements = statement_count(response)
+
+    samples = []
+    for i in range(2, repeat + 2):
+        request_args = case(i)
+        started = timer.perf_counter()
+        send(client, *request_args)
+        samples.append((timer.perf_counter() - started) * 1000)
+    samples.sort()
+    return {'p50': round(percentile(samples, 0.5), 2), 'p95': round(percentile(samples, 0.95), 2),
+            'p99': round(percentile(samples, 0.99), 2), 'statements': statements, 'peak_kib': round(peak / 1024)}
+
+
+def regressions(current: dict, baseline: dict) -> list[str]:
+    """Describe every metric of every route that is worse than its baseline"""
+    problems = []
+    for name, metrics in current.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if metrics['statements'] > before['statements']:
+            problems.append(f"{name}: {metrics['statements']} SQL statements, baseline {before['statements']}")
+        if metrics['p95'] > max(before['p95'] * LATENCY_TOLERANCE, before['p95'] + LATENCY_SLACK_MS):
+            problems.append(f"{name}: p95 {metrics['p95']:.1f} ms, baseline {before['p95']:.1f} ms")
+        if metrics['peak_kib'] > before['peak_kib'] * MEMORY_TOLERANCE + MEMORY_SLACK_KIB:
+            problems.append(f"{name}: peak memory {metrics['peak_kib']:.0f} KiB, baseline {before['peak_kib']:.0f} KiB")
+    return problems
+
+
+def bench_routes(sizes: list[int] = (2000,), save_baseline: bool = False) -> int:
+    """Every list and CRUD route against a generated dataset, checked against the stored baseline"""
+    baselines = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as baseline_file:
+            baselines = json.load(baseline_file)
+    problems = []
+    for size in sizes:
+        with app.app_context():
+            ids = seed_route_dataset(size, REPEAT + 2)
+            key = f'{db.engine.dialect.name}:{size}'
+        cases = route_cases(ids)
+        client = app.test_client()
+
+        print(f"\n{'route':<30} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'peak KiB':>9}")
+        results = {}
+        for name, case in cases.items():
+            results[name] = metrics = measure_route(client, case, REPEAT)
+            print(f"{name:<30} {metrics['p50']:>8.2f} {metrics['p95']:>8.2f} {metrics['p99']:>8.2f} "
+                  f"{metrics['statements']:>8} {metrics['peak_kib']:>9.0f}")
+
+        if save_baseline:
+            baselines[key] = results
+        elif key in baselines:
+            problems += [f'[{key}] {problem}' for problem in regressions(results, baselines[key])]
+        else:
+            print(f"No baseline for {key}; run with --save-baseline to record one")
+
+    if save_baseline:
+        with open(BASELINE_FILE, 'w') as baseline_file:
+            json.dump(baselines, baseline_file, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {BASELINE_FILE}")
+    if problems:
+        print("\nREGRESSIONS:")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+    return 0
+
+
+BENCHMARKS = {
+    'routes': bench_routes,
+    'appointments': bench_appointments,
+    'caregivers': bench_caregivers,
+    'search': bench_search,
+    'overlap': bench_overlap,
+    'matches': bench_matches,
+    'deletes': bench_deletes,
+    'signups': bench_signups,
+    'imports': bench_imports,
+    'sql': bench_sql,
+    'pool': bench_pool,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('--sizes', type=int, nargs='+')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='routes: record the results as the new baseline')
+    args = parser.parse_args()
+    options = {'sizes': args.sizes} if args.sizes else {}
+    if args.benchmark == 'routes':
+        options['save_baseline'] = args.save_baseline
+    return BENCHMARKS[args.benchmark](**options)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
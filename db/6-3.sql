@@ -1,5 +1,3 @@
 SELECT
-    AVG(c.hourly_rate * a.work_hours) AS average_pay
-FROM appointment a
-JOIN caregiver c ON a.caregiver_user_id = c.caregiver_user_id
-WHERE a.status = 'accepted';
\ No newline at end of file
+    SUM(e.total_earnings) / NULLIF(SUM(e.accepted_appointments), 0) AS average_pay
+FROM caregiver_earnings e;
\ No newline at end of file
@@ -1,13 +1,11 @@
 SELECT
-    a.appointment_id,
     CONCAT(cg_user.given_name, ' ', cg_user.surname) AS caregiver_name,
-    CONCAT(m_user.given_name, ' ', m_user.surname) AS member_name,
-    a.work_hours,
+    e.accepted_appointments,
+    e.accepted_hours,
     c.hourly_rate,
-    (c.hourly_rate * a.work_hours) AS total_cost
-FROM appointment a
-JOIN caregiver c ON a.caregiver_user_id = c.caregiver_user_id
+    e.total_earnings AS total_cost
+FROM caregiver_earnings e
+JOIN caregiver c ON e.caregiver_user_id = c.caregiver_user_id
 JOIN users cg_user ON c.caregiver_user_id = cg_user.user_id
-JOIN users m_user ON a.member_user_id = m_user.user_id
-WHERE a.status = 'accepted'
-ORDER BY a.appointment_id;
\ No newline at end of file
+WHERE e.accepted_appointments > 0
+ORDER BY e.caregiver_user_id;
\ No newline at end of file
@@ -1,21 +1,16 @@
 CREATE OR REPLACE VIEW job_applications_view AS
 SELECT
-    ja.job_id,
-    j.required_caregiving_type,
-    j.other_requirements,
-    j.date_posted,
-    CONCAT(m_user.given_name, ' ', m_user.surname) AS job_poster_name,
-    ja.caregiver_user_id,
-    CONCAT(cg_user.given_name, ' ', cg_user.surname) AS applicant_name,
-    c.caregiving_type,
-    c.hourly_rate,
-    ja.date_applied
-FROM job_application ja
-JOIN job j ON ja.job_id = j.job_id
-JOIN member m ON j.member_user_id = m.member_user_id
-JOIN users m_user ON m.member_user_id = m_user.user_id
-JOIN caregiver c ON ja.caregiver_user_id = c.caregiver_user_id
-JOIN users cg_user ON c.caregiver_user_id = cg_user.user_id;
+    job_id,
+    required_caregiving_type,
+    other_requirements,
+    date_posted,
+    job_poster_name,
+    caregiver_user_id,
+    applicant_name,
+    caregiving_type,
+    hourly_rate,
+    date_applied
+FROM job_application_listing;
 
 SELECT * FROM job_applications_view
 ORDER BY job_id, date_applied;
\ No newline at end of file
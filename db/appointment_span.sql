@@ -0,0 +1,13 @@
+-- Appointment start/end columns for the double-booking check (MySQL 5.7+)
+-- Generated from appointment_date, appointment_time and work_hours, with an index
+-- that answers "does this caregiver have an appointment in this slot" with one
+-- range probe. New databases created by script.py already include both.
+
+ALTER TABLE appointment
+    ADD COLUMN starts_at DATETIME GENERATED ALWAYS AS (
+        TIMESTAMP(appointment_date, appointment_time)
+    ) STORED,
+    ADD COLUMN ends_at DATETIME GENERATED ALWAYS AS (
+        TIMESTAMP(appointment_date, appointment_time) + INTERVAL ROUND(work_hours * 60) MINUTE
+    ) STORED,
+    ADD INDEX idx_appointment_caregiver_span (caregiver_user_id, starts_at, ends_at);
@@ -0,0 +1,29 @@
+-- Caregiver earnings rollup read by reports 6.2 - 7
+-- Accepted hours, earnings and appointment count per caregiver. The app keeps it
+-- current on every appointment or hourly rate change; new databases created by
+-- script.py already include it, and `flask --app app rebuild-caregiver-earnings`
+-- creates and fills it as well.
+
+CREATE TABLE IF NOT EXISTS caregiver_earnings (
+    caregiver_user_id     INT PRIMARY KEY,
+    accepted_hours        NUMERIC(10,1) NOT NULL DEFAULT 0,
+    total_earnings        NUMERIC(14,3) NOT NULL DEFAULT 0,
+    accepted_appointments INT NOT NULL DEFAULT 0,
+    CONSTRAINT fk_caregiver_earnings_caregiver
+        FOREIGN KEY (caregiver_user_id)
+        REFERENCES caregiver(caregiver_user_id)
+        ON DELETE CASCADE
+);
+
+DELETE FROM caregiver_earnings;
+
+INSERT INTO caregiver_earnings (caregiver_user_id, accepted_hours, total_earnings, accepted_appointments)
+SELECT
+    c.caregiver_user_id,
+    COALESCE(SUM(a.work_hours), 0),
+    COALESCE(SUM(a.work_hours), 0) * c.hourly_rate,
+    COUNT(a.appointment_id)
+FROM caregiver c
+LEFT JOIN appointment a
+    ON a.caregiver_user_id = c.caregiver_user_id AND a.status = 'accepted'
+GROUP BY c.caregiver_user_id, c.hourly_rate;
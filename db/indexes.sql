@@ -39,3 +39,5 @@ CREATE INDEX IF NOT EXISTS idx_appointment_time ON appointment(appointment_time)
 CREATE INDEX IF NOT EXISTS idx_appointment_caregiver_id ON appointment(caregiver_user_id);
 CREATE INDEX IF NOT EXISTS idx_appointment_member_id ON appointment(member_user_id);
 
+-- Composite sort key for keyset pagination of the appointments list
+CREATE INDEX IF NOT EXISTS idx_appointment_date_id ON appointment(appointment_date, appointment_id);
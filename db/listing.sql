@@ -0,0 +1,52 @@
+-- Job application listing read by job_applications_view (query 8) and /job-applications
+-- One denormalized row per application with the job, poster and applicant columns.
+-- The app keeps it current through ORM events; new databases created by script.py
+-- already include it, and `flask --app app rebuild-job-application-listing` creates
+-- and fills it as well. Run 8.sql afterwards to point the view at it.
+
+CREATE TABLE IF NOT EXISTS job_application_listing (
+    caregiver_user_id        INT NOT NULL,
+    job_id                   INT NOT NULL,
+    date_applied             DATE NOT NULL,
+    required_caregiving_type VARCHAR(50) NOT NULL,
+    other_requirements       TEXT,
+    date_posted              DATE NOT NULL,
+    member_user_id           INT NOT NULL,
+    job_poster_name          VARCHAR(101) NOT NULL,
+    applicant_name           VARCHAR(101) NOT NULL,
+    caregiving_type          VARCHAR(50) NOT NULL,
+    hourly_rate              NUMERIC(6,2) NOT NULL,
+    PRIMARY KEY (caregiver_user_id, job_id),
+    INDEX idx_listing_date_applied (date_applied, caregiver_user_id, job_id),
+    INDEX idx_listing_job_date (job_id, date_applied),
+    INDEX idx_listing_member (member_user_id),
+    CONSTRAINT fk_listing_job_application
+        FOREIGN KEY (caregiver_user_id, job_id)
+        REFERENCES job_application(caregiver_user_id, job_id)
+        ON DELETE CASCADE
+);
+
+DELETE FROM job_application_listing;
+
+INSERT INTO job_application_listing (
+    caregiver_user_id, job_id, date_applied, required_caregiving_type, other_requirements,
+    date_posted, member_user_id, job_poster_name, applicant_name, caregiving_type, hourly_rate
+)
+SELECT
+    ja.caregiver_user_id,
+    ja.job_id,
+    ja.date_applied,
+    j.required_caregiving_type,
+    j.other_requirements,
+    j.date_posted,
+    j.member_user_id,
+    CONCAT(m_user.given_name, ' ', m_user.surname),
+    CONCAT(cg_user.given_name, ' ', cg_user.surname),
+    c.caregiving_type,
+    c.hourly_rate
+FROM job_application ja
+JOIN job j ON ja.job_id = j.job_id
+JOIN member m ON j.member_user_id = m.member_user_id
+JOIN users m_user ON m.member_user_id = m_user.user_id
+JOIN caregiver c ON ja.caregiver_user_id = c.caregiver_user_id
+JOIN users cg_user ON c.caregiver_user_id = cg_user.user_id;
@@ -0,0 +1,13 @@
+-- Full-text user search (MySQL 8.0+)
+-- Adds a digits-only phone column for prefix lookups and a FULLTEXT index on
+-- name and email. New databases created by script.py already include both;
+-- `flask --app app rebuild-search-index` applies the same change.
+
+ALTER TABLE users
+    ADD COLUMN phone_digits VARCHAR(20) GENERATED ALWAYS AS (
+        REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(
+            phone_number, '+', ''), ' ', ''), '-', ''), '(', ''), ')', '')
+    ) STORED,
+    ADD INDEX idx_users_phone_digits (phone_digits);
+
+ALTER TABLE users ADD FULLTEXT INDEX ft_users_search (given_name, surname, email);
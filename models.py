@@ -1,10 +1,83 @@
+import os
+import sqlite3
 from datetime import date
-from sqlalchemy import Column, Integer, String, Numeric, Date, Time, Text, ForeignKey, CheckConstraint
-from sqlalchemy.orm import relationship, validates
+from sqlalchemy import Column, Computed, Integer, BigInteger, String, Numeric, Date, DateTime, Time, Text, ForeignKey, ForeignKeyConstraint, CheckConstraint, Index, select, func, delete, insert, text, and_, or_
+from sqlalchemy.dialects.sqlite import DATETIME as SQLITE_DATETIME
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.orm import aliased, deferred, relationship, validates
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.selectable import Select, CompoundSelect
+from contextvars import ContextVar
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSession
+
+# Replica engine serving the reads of the current request, None for the primary
+current_replica: ContextVar = ContextVar('current_replica', default=None)
+
+
+class RoutingSession(FlaskSession):
+    """
+    Session that sends SELECTs to the current request's replica, and flushes
+    and every other statement (DML, DDL, text()) to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        replica = current_replica.get()
+        # A flush that found nothing to write returns without after_flush_postexec
+        flush_context = self.info.get('flush_context')
+        flushing = flush_context is not None and flush_context.has_work
+        if (replica is not None and bind is None and not flushing
+                and isinstance(clause, (Select, CompoundSelect))):
+            return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'before_flush')
+def start_routing_flush(session, flush_context, instances):
+    session.info['flush_context'] = flush_context
+
+
+@event.listens_for(RoutingSession, 'after_flush_postexec')
+@event.listens_for(RoutingSession, 'after_soft_rollback')
+def end_routing_flush(session, *args):
+    # A failed flush skips after_flush_postexec but always rolls back
+    session.info.pop('flush_context', None)
+
+
+@event.listens_for(Engine, 'connect')
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite ignores ON DELETE CASCADE unless each connection switches foreign keys on
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys = ON')
+        cursor.close()
+
 
 # Create db instance - will be initialized with app in app.py
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+
+def engine_options(database_url: str | None, poolclass=QueuePool) -> dict:
+    """Connection pool settings for create_engine, read from DB_POOL_* environment variables"""
+    if not database_url:
+        return {}
+    url = make_url(database_url)
+    # In-memory SQLite lives inside a single connection and cannot be pooled
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return {}
+    return {
+        'poolclass': poolclass,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '5')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '10')),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', '30')),
+        # PythonAnywhere closes MySQL connections that sit idle for 300 seconds
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '280')),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes'),
+    }
+
 
 # Standardized caregiving types - single source of truth
 CAREGIVING_TYPES = ['babysitter',
@@ -26,10 +99,19 @@ class Users(db.Model):
     password = Column(String(255), nullable=False)
 
     # Relationships
+    # Deleting a user leaves its rows to ON DELETE CASCADE instead of loading them
     caregiver = relationship(
-        'Caregiver', back_populates='user', uselist=False, cascade='all, delete-orphan')
+        'Caregiver', back_populates='user', uselist=False, cascade='all, delete-orphan', passive_deletes=True)
     member = relationship('Member', back_populates='user',
-                          uselist=False, cascade='all, delete-orphan')
+                          uselist=False, cascade='all, delete-orphan', passive_deletes=True)
+
+
+# Name prefix indexes for the typeahead (LIKE 'abc%'). SQLite's LIKE ignores
+# case, so it can only use NOCASE indexes for the prefix range scan.
+Index('idx_users_given_name', Users.given_name).ddl_if(dialect='mysql')
+Index('idx_users_surname', Users.surname).ddl_if(dialect='mysql')
+Index('idx_users_given_name_nocase', Users.given_name.collate('NOCASE')).ddl_if(dialect='sqlite')
+Index('idx_users_surname_nocase', Users.surname.collate('NOCASE')).ddl_if(dialect='sqlite')
 
 
 class Caregiver(db.Model):
@@ -50,9 +132,9 @@ class Caregiver(db.Model):
     # Relationships
     user = relationship('Users', back_populates='caregiver')
     appointments = relationship(
-        'Appointment', back_populates='caregiver', cascade='all, delete-orphan')
+        'Appointment', back_populates='caregiver', cascade='all, delete-orphan', passive_deletes=True)
     job_applications = relationship(
-        'JobApplication', back_populates='caregiver', cascade='all, delete-orphan')
+        'JobApplication', back_populates='caregiver', cascade='all, delete-orphan', passive_deletes=True)
 
     @validates('caregiving_type')
     def validate_caregiving_type(self, key: str, value: str) -> str:
@@ -73,11 +155,11 @@ class Member(db.Model):
     # Relationships
     user = relationship('Users', back_populates='member')
     address = relationship('Address', back_populates='member',
-                           uselist=False, cascade='all, delete-orphan')
+                           uselist=False, cascade='all, delete-orphan', passive_deletes=True)
     jobs = relationship('Job', back_populates='member',
-                        cascade='all, delete-orphan')
+                        cascade='all, delete-orphan', passive_deletes=True)
     appointments = relationship(
-        'Appointment', back_populates='member', cascade='all, delete-orphan')
+        'Appointment', back_populates='member', cascade='all, delete-orphan', passive_deletes=True)
 
 
 class Address(db.Model):
@@ -110,7 +192,7 @@ class Job(db.Model):
     # Relationships
     member = relationship('Member', back_populates='jobs')
     applications = relationship(
-        'JobApplication', back_populates='job', cascade='all, delete-orphan')
+        'JobApplication', back_populates='job', cascade='all, delete-orphan', passive_deletes=True)
 
     @validates('required_caregiving_type')
     def validate_required_caregiving_type(self, key: str, value: str) -> str:
@@ -134,6 +216,53 @@ class JobApplication(db.Model):
     job = relationship('Job', back_populates='applications')
 
 
+# MySQL indexes every foreign key column itself; SQLite does not, so without
+# these each ON DELETE CASCADE from a member or job scans the child table
+Index('idx_job_member', Job.member_user_id).ddl_if(dialect='sqlite')
+Index('idx_job_application_job', JobApplication.job_id).ddl_if(dialect='sqlite')
+
+
+# Longest appointment allowed by check_work_hours_positive
+MAX_WORK_HOURS = 24
+
+
+class AppointmentStart(ColumnElement):
+    """appointment_date + appointment_time, in each dialect's date arithmetic"""
+    inherit_cache = True
+
+
+class AppointmentEnd(ColumnElement):
+    """The appointment start plus work_hours, in each dialect's date arithmetic"""
+    inherit_cache = True
+
+
+@compiles(AppointmentStart, 'mysql')
+def _appointment_start_mysql(element, compiler, **kw):
+    return 'TIMESTAMP(appointment_date, appointment_time)'
+
+
+@compiles(AppointmentEnd, 'mysql')
+def _appointment_end_mysql(element, compiler, **kw):
+    return 'TIMESTAMP(appointment_date, appointment_time) + INTERVAL ROUND(work_hours * 60) MINUTE'
+
+
+@compiles(AppointmentStart, 'sqlite')
+def _appointment_start_sqlite(element, compiler, **kw):
+    return "datetime(appointment_date || ' ' || appointment_time)"
+
+
+@compiles(AppointmentEnd, 'sqlite')
+def _appointment_end_sqlite(element, compiler, **kw):
+    return ("datetime(appointment_date || ' ' || appointment_time, "
+            "'+' || CAST(ROUND(work_hours * 60) AS INTEGER) || ' minutes')")
+
+
+# SQLite's datetime() has no fractional seconds, so parameters compared with the
+# generated columns must be stored the same way
+AppointmentDateTime = DateTime().with_variant(SQLITE_DATETIME(
+    storage_format='%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d'), 'sqlite')
+
+
 class Appointment(db.Model):
     __tablename__ = 'appointment'
     __table_args__ = (
@@ -145,6 +274,10 @@ class Appointment(db.Model):
             "work_hours > 0 AND work_hours <= 24",
             name='check_work_hours_positive'
         ),
+        # Keyset pagination sort key for the appointments list
+        Index('idx_appointment_date_id', 'appointment_date', 'appointment_id'),
+        # Double-booking check: one range probe per caregiver and start time
+        Index('idx_appointment_caregiver_span', 'caregiver_user_id', 'starts_at', 'ends_at'),
     )
     appointment_id = Column(Integer, primary_key=True, autoincrement=True)
     caregiver_user_id = Column(Integer, ForeignKey(
@@ -155,6 +288,9 @@ class Appointment(db.Model):
     appointment_time = Column(Time, nullable=False)
     work_hours = Column(Numeric(4, 1), nullable=False)
     status = Column(String(20), nullable=False, default='pending')
+    # Generated from the date, time and hours; deferred so they are only read by the overlap check
+    starts_at = deferred(Column(AppointmentDateTime, Computed(AppointmentStart(), persisted=True)))
+    ends_at = deferred(Column(AppointmentDateTime, Computed(AppointmentEnd(), persisted=True)))
 
     # Relationships
     caregiver = relationship('Caregiver', back_populates='appointments')
@@ -173,6 +309,182 @@ class Appointment(db.Model):
         """Validate work hours - must be positive and not exceed 24 hours"""
         if value <= 0:
             raise ValueError("Work hours must be a positive number.")
-        if value > 24:
+        if value > MAX_WORK_HOURS:
             raise ValueError("Work hours cannot exceed 24 hours.")
         return value
+
+
+Index('idx_appointment_member', Appointment.member_user_id).ddl_if(dialect='sqlite')
+
+
+class TableStats(db.Model):
+    """Materialized row counts for the dashboard, kept in sync by ORM events in app.py"""
+    __tablename__ = 'table_stats'
+    table_name = Column(String(64), primary_key=True)
+    row_count = Column(BigInteger, nullable=False, default=0)
+
+
+# Tables whose row counts are materialized in table_stats
+COUNTED_MODELS = [Users, Caregiver, Member, Address, Job, Appointment, JobApplication]
+COUNTED_TABLES = [model.__tablename__ for model in COUNTED_MODELS]
+
+
+def rebuild_table_stats(connection) -> dict[str, int]:
+    """Recount every counted table and replace the contents of table_stats"""
+    counts = {model.__tablename__: connection.execute(
+        select(func.count()).select_from(model.__table__)).scalar()
+        for model in COUNTED_MODELS}
+    connection.execute(delete(TableStats.__table__))
+    connection.execute(insert(TableStats.__table__), [
+        {'table_name': table, 'row_count': count} for table, count in counts.items()])
+    return counts
+
+
+# SQLite FTS5 table behind the user search, kept in sync by ORM events in app.py
+USERS_SEARCH_TABLE = 'users_search'
+PHONE_DIGITS_SQL = ("REPLACE(REPLACE(REPLACE(REPLACE(REPLACE("
+                    "phone_number, '+', ''), ' ', ''), '-', ''), '(', ''), ')', '')")
+
+
+def rebuild_users_search_table(connection) -> int:
+    """Create the SQLite FTS5 users_search table if missing and reindex every user - returns the users indexed"""
+    connection.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {USERS_SEARCH_TABLE} USING fts5("
+        f"given_name, surname, email, phone_digits, prefix='2 3')"))
+    connection.execute(text(f"DELETE FROM {USERS_SEARCH_TABLE}"))
+    return connection.execute(text(
+        f"INSERT INTO {USERS_SEARCH_TABLE} (rowid, given_name, surname, email, phone_digits) "
+        f"SELECT user_id, given_name, surname, email, {PHONE_DIGITS_SQL} FROM users")).rowcount
+
+
+class CaregiverEarnings(db.Model):
+    """Accepted hours and earnings per caregiver, kept in sync by ORM events in app.py"""
+    __tablename__ = 'caregiver_earnings'
+    caregiver_user_id = Column(Integer, ForeignKey(
+        'caregiver.caregiver_user_id', ondelete='CASCADE'), primary_key=True)
+    accepted_hours = Column(Numeric(10, 1), nullable=False, default=0)
+    total_earnings = Column(Numeric(14, 3), nullable=False, default=0)
+    accepted_appointments = Column(Integer, nullable=False, default=0)
+
+
+def rebuild_caregiver_earnings(connection, caregiver_ids=None) -> int:
+    """
+    Recompute caregiver_earnings from the accepted appointments, for every caregiver
+    or only the given ones. Returns the number of caregivers written.
+    """
+    hours = func.coalesce(func.sum(Appointment.work_hours), 0)
+    rollup = select(
+        Caregiver.caregiver_user_id,
+        hours,
+        hours * Caregiver.hourly_rate,
+        func.count(Appointment.appointment_id)
+    ).select_from(Caregiver).outerjoin(Appointment, and_(
+        Appointment.caregiver_user_id == Caregiver.caregiver_user_id,
+        Appointment.status == 'accepted'
+    )).group_by(Caregiver.caregiver_user_id, Caregiver.hourly_rate)
+    clear = delete(CaregiverEarnings.__table__)
+    if caregiver_ids is not None:
+        rollup = rollup.where(Caregiver.caregiver_user_id.in_(caregiver_ids))
+        clear = clear.where(CaregiverEarnings.caregiver_user_id.in_(caregiver_ids))
+    connection.execute(clear)
+    return connection.execute(insert(CaregiverEarnings.__table__).from_select([
+        'caregiver_user_id', 'accepted_hours', 'total_earnings', 'accepted_appointments'
+    ], rollup)).rowcount
+
+
+class JobApplicationListing(db.Model):
+    """
+    Denormalized job applications with the job, poster and applicant columns of
+    job_applications_view, kept in sync by ORM events in app.py
+    """
+    __tablename__ = 'job_application_listing'
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ['caregiver_user_id', 'job_id'],
+            ['job_application.caregiver_user_id', 'job_application.job_id'],
+            ondelete='CASCADE'
+        ),
+        # Sort key of the job applications list and of job_applications_view
+        Index('idx_listing_date_applied', 'date_applied', 'caregiver_user_id', 'job_id'),
+        Index('idx_listing_job_date', 'job_id', 'date_applied'),
+        Index('idx_listing_member', 'member_user_id'),
+    )
+    caregiver_user_id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, primary_key=True)
+    date_applied = Column(Date, nullable=False)
+    required_caregiving_type = Column(String(50), nullable=False)
+    other_requirements = Column(Text)
+    date_posted = Column(Date, nullable=False)
+    member_user_id = Column(Integer, nullable=False)
+    job_poster_name = Column(String(101), nullable=False)
+    applicant_name = Column(String(101), nullable=False)
+    caregiving_type = Column(String(50), nullable=False)
+    hourly_rate = Column(Numeric(6, 2), nullable=False)
+
+
+def job_application_listing_select():
+    """The six-way join behind job_applications_view, with the listing's column names"""
+    member_user = aliased(Users)
+    applicant_user = aliased(Users)
+    return select(
+        JobApplication.caregiver_user_id,
+        JobApplication.job_id,
+        JobApplication.date_applied,
+        Job.required_caregiving_type,
+        Job.other_requirements,
+        Job.date_posted,
+        Job.member_user_id,
+        (member_user.given_name + ' ' + member_user.surname).label('job_poster_name'),
+        (applicant_user.given_name + ' ' + applicant_user.surname).label('applicant_name'),
+        Caregiver.caregiving_type,
+        Caregiver.hourly_rate
+    ).select_from(JobApplication).join(
+        Job, Job.job_id == JobApplication.job_id
+    ).join(
+        member_user, member_user.user_id == Job.member_user_id
+    ).join(
+        Caregiver, Caregiver.caregiver_user_id == JobApplication.caregiver_user_id
+    ).join(
+        applicant_user, applicant_user.user_id == JobApplication.caregiver_user_id
+    )
+
+
+def rebuild_job_application_listing(connection, caregiver_ids=None, job_ids=None, member_ids=None) -> int:
+    """
+    Rewrite job_application_listing from the source tables: every row, or only the
+    applications of the given caregivers, jobs or job posters. Returns the rows written.
+    """
+    listing = JobApplicationListing.__table__
+    rows = job_application_listing_select()
+    clear = delete(listing)
+    scopes = [(caregiver_ids, listing.c.caregiver_user_id, JobApplication.caregiver_user_id),
+              (job_ids, listing.c.job_id, JobApplication.job_id),
+              (member_ids, listing.c.member_user_id, Job.member_user_id)]
+    scopes = [(ids, target, source) for ids, target, source in scopes if ids is not None]
+    if scopes:
+        clear = clear.where(or_(*[target.in_(ids) for ids, target, source in scopes]))
+        rows = rows.where(or_(*[source.in_(ids) for ids, target, source in scopes]))
+    connection.execute(clear)
+    return connection.execute(insert(listing).from_select(
+        [column.name for column in listing.columns], rows)).rowcount
+
+
+def job_application_listing_drift(connection) -> dict[str, set[tuple[int, int]]]:
+    """
+    Compare job_application_listing with the source tables and return the keys
+    (caregiver_user_id, job_id) that are missing, orphaned or out of date.
+    """
+    listing = JobApplicationListing.__table__
+    source = job_application_listing_select().subquery()
+    on_key = and_(listing.c.caregiver_user_id == source.c.caregiver_user_id,
+                  listing.c.job_id == source.c.job_id)
+    missing = select(source.c.caregiver_user_id, source.c.job_id).select_from(
+        source.outerjoin(listing, on_key)).where(listing.c.job_id.is_(None))
+    orphaned = select(listing.c.caregiver_user_id, listing.c.job_id).select_from(
+        listing.outerjoin(source, on_key)).where(source.c.job_id.is_(None))
+    stale = select(listing.c.caregiver_user_id, listing.c.job_id).select_from(
+        listing.join(source, on_key)).where(or_(*[
+            listing.c[column.name].is_distinct_from(source.c[column.name])
+            for column in listing.columns if not column.primary_key]))
+    return {name: {tuple(row) for row in connection.execute(query)}
+            for name, query in (('missing', missing), ('orphaned', orphaned), ('stale', stale))}